@@ -2,39 +2,90 @@ from flask import Flask, request, jsonify, redirect
 import pickle
 import os
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.efficientnet import preprocess_input
-import pandas as pd
-import base64
-import io
-from PIL import Image
-import joblib
+import hashlib
+import gc
+import atexit
+import functools
+import importlib.util
+import secrets
 import dash_bootstrap_components as dbc
+from inference.tabular import validate_records, canonical_record
+from inference.batching import MicroBatcher
+from inference.registry import ModelNotServed, memory_usage
+from inference.models import registry, imageBackend, batch_models
+from inference.workers import InferencePool, WorkerCrashed, pool_size
+from inference.cache import LRUCache, DiskBackedLRUCache
+from inference.uploads import read_image_upload, ImageMissing, ImageDecodeError
+from inference.preprocessing import preprocess_image
+from concurrent.futures import ThreadPoolExecutor
 
-def convert_to_valid_binary(x, true, false):
-    if type(x) == str: x = x.lower().strip()
-    if x in ['yes', 'y', True, 'true', 1]: return true
-    if x in ['no', 'n', False, 'false', 0]: return false
-    return None
+app = Flask(__name__)
 
-def convert_to_valid_gender(x, male, female):
-    if type(x) == str: x = x.lower().strip()
-    if x in ['male', 'm']: return male
-    if x in ['female', 'f']: return female
-    return None
+registry.warm_up(os.environ.get("WARMUP_MODELS", ""))
 
-app = Flask(__name__)
+# repeated tabular predictions (same normalized features, same model version) skip the model entirely;
+# PREDICTION_CACHE_SIZE=0 disables the cache. Model files are checked for changes every
+# MODEL_WATCH_SECONDS and a changed model is reloaded and its cached results dropped.
+predictionCache = LRUCache(
+    maxsize=int(os.environ.get("PREDICTION_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("PREDICTION_CACHE_TTL", 3600)) or None
+)
+modelWatchSeconds = float(os.environ.get("MODEL_WATCH_SECONDS", 5))
+
+# repeated images (same decoded bytes, same model file) reuse the stored probabilities and skip the
+# image decode and the CNN; IMAGE_CACHE_BYTES caps the memory used (0 disables the cache) and
+# IMAGE_CACHE_DIR also keeps the results on disk so they survive restarts
+imageCacheBytes = int(os.environ.get("IMAGE_CACHE_BYTES", 8 * 2**20))
+imageCache = DiskBackedLRUCache(
+    directory=os.environ.get("IMAGE_CACHE_DIR") or None,
+    max_disk_bytes=int(os.environ.get("IMAGE_CACHE_DISK_BYTES", 256 * 2**20)),
+    maxsize=None if imageCacheBytes else 0,
+    max_bytes=imageCacheBytes or None,
+    # the probabilities are a few bytes, the key and the bookkeeping around them are not
+    sizeof=lambda value: value.nbytes + 256
+)
 
-brainTumorModel = load_model(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "brainTumor.h5"))
-pcosModel = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "pcos.pkl"))
-diabetesModel = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "diabetes.pkl"))
-heartFailureScalerModel = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "scaler_heart.pkl"))
-heartFailureModel = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "heart_clinic_model_optimized.pkl"))
-kidneyModel = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", 'kidney_model.pkl'))
-kidneyScaler = joblib.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", 'kidney_scaler.pkl'))
-skinCancerModel = load_model(os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", 'skinCancer.h5'))
+def image_cache_key(model, digest):
+    # the tag changes with the model file, so results of an older model are never reused
+    tag = hashlib.blake2b(repr((imageBackend, registry.signature(model))).encode(), digest_size=6).hexdigest()
+    return (model, tag, digest)
+
+def invalidate_caches(group):
+    predictionCache.invalidate(lambda key: key[0] == group)
+    imageCache.invalidate(lambda key: key[0] == group)
+
+registry.on_change(invalidate_caches)
+
+# concurrent image requests are grouped into one forward pass of up to IMAGE_BATCH_MAX_SIZE images,
+# waiting at most IMAGE_BATCH_MAX_WAIT_MS for the batch to fill up
+imageBatchMaxSize = int(os.environ.get("IMAGE_BATCH_MAX_SIZE", 8))
+imageBatchMaxWaitMs = float(os.environ.get("IMAGE_BATCH_MAX_WAIT_MS", 5))
+# JPEGs are decoded at reduced size when they are much larger than the model input (IMAGE_JPEG_DRAFT=0
+# decodes them at full size); IMAGE_DECODE_THREADS > 0 decodes in a shared pool of that many threads,
+# which caps how many full-size images are in memory at once
+imageJpegDraft = os.environ.get("IMAGE_JPEG_DRAFT", "1") != "0"
+imageDecodeThreads = int(os.environ.get("IMAGE_DECODE_THREADS", 0))
+imageDecodePool = ThreadPoolExecutor(imageDecodeThreads, thread_name_prefix="image-decode") if imageDecodeThreads > 0 else None
+
+# INFERENCE_WORKERS=N (or "auto", one per core) runs the models in N worker processes instead of the
+# request threads; each worker preloads INFERENCE_WORKER_MODELS (default: every served model)
+inferenceWorkers = pool_size(os.environ.get("INFERENCE_WORKERS"))
+inferencePool = InferencePool(
+    inferenceWorkers,
+    preload=os.environ.get("INFERENCE_WORKER_MODELS", "all"),
+    timeout=float(os.environ.get("INFERENCE_TIMEOUT", 60)),
+    watch_seconds=modelWatchSeconds
+) if inferenceWorkers else None
+if inferencePool is not None:
+    atexit.register(inferencePool.close)
+
+def run_image_model(name, x):
+    if inferencePool is not None:
+        return inferencePool.predict_image(name, x)
+    return registry.get(name).predict(x)
+
+brainTumorBatcher = MicroBatcher(lambda x: run_image_model("brainTumor", x), imageBatchMaxSize, imageBatchMaxWaitMs, "brainTumor")
+skinCancerBatcher = MicroBatcher(lambda x: run_image_model("skinCancer", x), imageBatchMaxSize, imageBatchMaxWaitMs, "skinCancer")
 
 import dash
 from dash import Dash, html, dcc
@@ -72,206 +123,184 @@ kidney_dash_app = Dash(
 )
 
 from dashboards import pcos, diabetes, heart, kidney
+from dashboards.cache import dashboardCache
+from dashboards import data as dashboardData
 
 pcos_dash_app.layout = pcos.layout
 diabetes_dash_app.layout = diabetes.layout
 heart_dash_app.layout = heart.layout
 kidney_dash_app.layout = kidney.layout
 
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# the PCOS assistant of datasets/pcos/rag.py served to many users at /assistant/pcos; each session's
+# profile is kept in a bounded store (ASSISTANT_SESSIONS, ASSISTANT_SESSION_TTL) and, with
+# ASSISTANT_SESSION_DB set to a file, also in SQLite
+pcosAssistant = load_module("pcos_assistant", os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets", "pcos", "rag.py"))
+assistantSessions = pcosAssistant.SessionStore(
+    maxsize=int(os.environ.get("ASSISTANT_SESSIONS", 10000)),
+    ttl=float(os.environ.get("ASSISTANT_SESSION_TTL", 1800)) or None,
+    db_path=os.environ.get("ASSISTANT_SESSION_DB") or None
+)
+
+def run_batch(model, records, fields, numeric, binary, key, predict):
+    valid, errors = validate_records(records, fields, numeric, binary)
+    results = [{"index": i, "error": errors[i]} if i in errors else None for i in range(len(records))]
+
+    keys = {}
+    if predictionCache.maxsize:
+        version = registry.version(model)
+        for i in valid:
+            try:
+                record_key = (model, version, canonical_record(records[i], fields, key))
+                cached = predictionCache.get(record_key)
+            except (TypeError, ValueError):
+                # not a usable (hashable) key: predicted without the cache
+                continue
+            keys[i] = record_key
+            if cached is not None:
+                results[i] = {"index": i, **cached}
+        valid = [i for i in valid if results[i] is None]
+    if not valid:
+        return results
+
+    rows = [records[i] for i in valid]
+    try:
+        outputs = predict(rows)
+    except (WorkerCrashed, TimeoutError):
+        # the inference worker died or hung; retrying row by row would only repeat that
+        raise
+    except Exception as e:
+        # one bad value must not sink the whole batch, so retry row by row to find it
+        print(f"Batch prediction failed, retrying per row: {e}")
+        outputs = []
+        for row in rows:
+            try:
+                outputs.append(predict([row])[0])
+            except Exception as row_error:
+                outputs.append({"error": f"prediction failed: {row_error}"})
+    for i, output in zip(valid, outputs):
+        results[i] = {"index": i, **output}
+        if i in keys and "error" not in output:
+            predictionCache.set(keys[i], output)
+    return results
+
+def predict_records(model, records):
+    registry.check(model)
+    registry.refresh_if_due(modelWatchSeconds)
+    fields, numeric, binary, key, predict = batch_models[model]
+    if inferencePool is not None:
+        predict = functools.partial(inferencePool.predict_records, model)
+    return run_batch(model, records, fields, numeric, binary, key, predict)
+
+def batch_response(model, records):
+    results = predict_records(model, records)
+    return jsonify({
+        "model": model,
+        "count": len(results),
+        "errors": sum(1 for r in results if "error" in r),
+        "results": results
+    })
+
+@app.errorhandler(ModelNotServed)
+def model_not_served(e):
+    return f"The {e.args[0]} model is not served by this process", 404
+
+# an inference worker died or hung with the request in flight; the same contract as the admission limiter
+@app.errorhandler(WorkerCrashed)
+@app.errorhandler(TimeoutError)
+def inference_unavailable(e):
+    print(f"Inference failed: {e}")
+    return jsonify({"error": f"inference failed: {e}"}), 503, {"Retry-After": "1"}
+
+@app.route("/batch/<model>", methods=["POST"])
+def batch(model):
+    if model not in batch_models:
+        return jsonify({"error": f"unknown model '{model}', expected one of {list(batch_models)}"}), 404
+    records = request.json
+    if isinstance(records, dict):
+        records = records.get('records')
+    if not isinstance(records, list):
+        return jsonify({"error": "expected a JSON array of records (or {\"records\": [...]})"}), 400
+    return batch_response(model, records)
+
 @app.route("/heartFailure", methods=["POST"])
 def predict_heart_disease():
     data = request.json
+    if isinstance(data, list):
+        return batch_response("heartFailure", data)
 
-    cols_order = ['Age', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol', 'FastingBS', 'RestingECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'ST_Slope', 'MaxHR_Age', 'Oldpeak_Slope']
-
-    for d in ['Age', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol', 'FastingBS', 'RestingECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'ST_Slope']:
-        try:
-            fsdghaw = data[d]
-        except KeyError:
-            return f"{d} is missing, please provide it" 
-
-    sex_map = {'Male': 1, 'Female': 0} 
-    cp_map = {'ASY': 0, 'ATA': 1, 'NAP': 2, 'TA': 3} 
-    restecg_map = {'Normal': 1, 'ST-T Wave Abnormality': 2, 'LVH': 0}
-    exang_map = {'Yes': 1, 'No': 0}
-    slope_map = {'Up': 2, 'Flat': 1, 'Down': 0}
-
-    input_data = pd.DataFrame([[
-        data['Age'], sex_map.get(convert_to_valid_gender(data['Sex'], 'Male', 'Female'), 1), cp_map.get(data['ChestPainType'], 0), data['RestingBP'], data['Cholesterol'], data['FastingBS'], 
-        restecg_map.get(data['RestingECG'], 1), data['MaxHR'], exang_map.get(convert_to_valid_binary(data['ExerciseAngina'], 1, 0), 0), 
-        data['Oldpeak'], slope_map.get(data['ST_Slope'], 1)
-    ]], columns=['Age', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol', 'FastingBS', 
-                 'RestingECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'ST_Slope'])
-    
-    input_data['MaxHR_Age'] = input_data['MaxHR'] / input_data['Age']
-    
-    slope_val_num = input_data['ST_Slope'].values[0]
-    slope_factor = 1 if slope_val_num == 1 else (2 if slope_val_num == 2 else 0)
-    input_data['Oldpeak_Slope'] = input_data['Oldpeak'] * slope_factor
-    
-    input_data = input_data[cols_order]
-
-    input_data_scaled = heartFailureScalerModel.transform(input_data)
-    
-    prediction = heartFailureModel.predict(input_data_scaled)[0]
-    probability = heartFailureModel.predict_proba(input_data_scaled)[0][1] 
-    return f"Heart failure prediction is {prediction} with probability of {probability * 100}%"
+    res = predict_records("heartFailure", [data])[0]
+    if "error" in res:
+        return res["error"]
+    return f"Heart failure prediction is {res['prediction']} with probability of {res['probability'] * 100}%"
 
 @app.route("/kidney", methods=["POST"])
 def kidney():
     data = request.json
-    for d in ['Bp', 'Sg', 'Al', 'Su', 'Rbc', 'Bu', 'Sc', 'Sod', 'Pot', 'Hemo', 'Wbcc', 'Rbcc', 'Htn']:
-        try:
-            fsdghaw = data[d]
-        except KeyError:
-            return f"{d} is missing, please provide it" 
-    df = pd.DataFrame([{
-        "Bp": data['Bp'],
-        "Sg": data['Sg'],
-        "Al": data['Al'],
-        "Su": data['Su'],
-        "Rbc": data['Rbc'],
-        "Bu": data['Bu'],
-        "Sc": data['Sc'],
-        "Sod": data['Sod'],
-        "Pot": data['Pot'],
-        "Hemo": data['Hemo'],
-        "Wbcc": data['Wbcc'],
-        "Rbcc": data['Rbcc'],
-        "Htn": convert_to_valid_binary(data['Htn'], 1, 0)
-    }])
-    data_scaled = kidneyScaler.transform(df)
-    res = kidneyModel.predict(data_scaled)
-    return f"chronic kidney disease prediction is {res[0]}"
+    if isinstance(data, list):
+        return batch_response("kidney", data)
+
+    res = predict_records("kidney", [data])[0]
+    if "error" in res:
+        return res["error"]
+    return f"chronic kidney disease prediction is {res['prediction']}"
 
 @app.route("/diabetes", methods=["POST"])
 def diabetes():
     data = request.json
-    for d in ['gender', 'age', 'hypertension', 'heart_disease', 'smoking_history', 'bmi', 'HbA1c_level', 'blood_glucose_level']:
-        try:
-            fsdghaw = data[d]
-        except KeyError:
-            return f"{d} is missing, please provide it" 
-    df = pd.DataFrame([{
-        "gender": convert_to_valid_gender(data['gender'], 'Male', 'Female'),
-        "age": data['age'],
-        "hypertension": convert_to_valid_binary(data['hypertension'], 1, 0),
-        "heart_disease": convert_to_valid_binary(data['heart_disease'], 1, 0),
-        "smoking_history": data['smoking_history'],
-        "bmi": data['bmi'],
-        "HbA1c_level": data['HbA1c_level'],
-        "blood_glucose_level": data['blood_glucose_level']
-    }])
-    res = diabetesModel.predict(df)
-    return f"diabetes prediction is {'positive' if res[0] else 'negative'}"
+    if isinstance(data, list):
+        return batch_response("diabetes", data)
+
+    res = predict_records("diabetes", [data])[0]
+    if "error" in res:
+        return res["error"]
+    return f"diabetes prediction is {res['label']}"
 
 @app.route("/pcos", methods=["POST"])
 def pcos():
     data = request.json
-    for d in ['bmi', 'age', 'pulse_rate', 'blood_group']:
-        try:
-            fsdghaw = data[d]
-        except KeyError:
-            return f"{d} is missing, please provide it" 
-
-    df = pd.DataFrame([{
-        "Age (yrs)": 33,
-        "Weight (Kg)": 58,
-        "Height(Cm)": 159,
-        "BMI": 23.14,
-        "Pulse rate(bpm)": 72,
-        "RR (breaths/min)": 20,
-        "Hb(g/dl)": 11,
-        "Cycle(R/I)": 2,
-        "Cycle length(days)": 5,
-        "Marraige Status (Yrs)": 13,
-        "No. of aborptions": 2,
-        "I   beta-HCG(mIU/mL)": 100,
-        "II    beta-HCG(mIU/mL)": 100,
-        "FSH(mIU/mL)": 4.9,
-        "LH(mIU/mL)": 3.1,
-        "FSH/LH": 1.6,
-        "Hip(inch)": 44,
-        "Waist(inch)": 38,
-        "Waist:Hip Ratio": .9,
-        "TSH (mIU/L)": 12.2,
-        "AMH(ng/mL)": 1.5,
-        "PRL(ng/mL)": 4,
-        "Vit D3 (ng/mL)": 38,
-        "PRG(ng/mL)": .26,
-        "RBS(mg/dl)": 91,
-        "BP _Systolic (mmHg)": 120,
-        "BP _Diastolic (mmHg)": 80,
-        "Follicle No. (L)": 7,
-        "Follicle No. (R)": 6,
-        "Avg. F size (L) (mm)": 15,
-        "Avg. F size (R) (mm)": 18,
-        "Endometrium (mm)": 7,
-        "Blood Group_A-": False,
-        "Blood Group_AB+": False,
-        "Blood Group_AB-": False,
-        "Blood Group_B+": True,
-        "Blood Group_B-": False,
-        "Blood Group_O+": False,
-        "Blood Group_O-": False,
-        "Pregnant(Y/N)_yes": True,
-        "Weight gain(Y/N)_yes": True,
-        "hair growth(Y/N)_yes": False,
-        "Skin darkening (Y/N)_yes": False,
-        "Hair loss(Y/N)_yes": False,
-        "Pimples(Y/N)_yes": False,
-        "Fast food (Y/N)_yes": False,
-        "Reg.Exercise(Y/N)_yes": False
-    }])
-    df.loc[0, 'Age (yrs)'] = data['age']
-    df.loc[0, 'BMI'] = data['bmi']
-    df.loc[0, 'Pulse rate(bpm)'] = data['pulse_rate']
-    df.loc[0, 'Blood Group_A-'] = data['blood_group'] == 'A-'
-    df.loc[0, 'Blood Group_AB+'] = data['blood_group'] == 'AB+'
-    df.loc[0, 'Blood Group_AB-'] = data['blood_group'] == 'AB-'
-    df.loc[0, 'Blood Group_B+'] = data['blood_group'] == 'B+'
-    df.loc[0, 'Blood Group_B-'] = data['blood_group'] == 'B-'
-    df.loc[0, 'Blood Group_O+'] = data['blood_group'] == 'O+'
-    df.loc[0, 'Blood Group_O-'] = data['blood_group'] == 'O-'
-    res = pcosModel.predict(df)
-    return f"PCOS prediction is {'positive' if res[0] else 'negative'}"
+    if isinstance(data, list):
+        return batch_response("pcos", data)
+
+    res = predict_records("pcos", [data])[0]
+    if "error" in res:
+        return res["error"]
+    return f"PCOS prediction is {res['label']}"
 
 @app.route("/brainTumor", methods=["POST"])
 def brainTumor():
-    data = request.json
-
-    target_size=(224, 224)
-    base64_image_string = data.get('image')
-
-    if not base64_image_string:
-        return "Error: 'image' not found in input data."
+    registry.check("brainTumor")
 
     try:
-        if ';base64,' in base64_image_string:
-            _, base64_image_string = base64_image_string.split(';base64,')
-            
-        image_data = base64.b64decode(base64_image_string)
-    except Exception as e:
+        image_stream, digest = read_image_upload(request)
+    except ImageMissing:
+        return "Error: 'image' not found in input data."
+    except ImageDecodeError as e:
         print(f"Error decoding Base64: {e}")
         return "Base64 decoding failed."
 
-    try:
-        image_stream = io.BytesIO(image_data)
-        img = Image.open(image_stream).convert('RGB')
-        img = img.resize(target_size)
-    except Exception as e:
-        print(f"Error processing image data: {e}")
-        return "Image processing failed."
+    registry.refresh_if_due(modelWatchSeconds)
+    cacheKey = image_cache_key("brainTumor", digest)
+    probabilities = imageCache.get(cacheKey)
+    if probabilities is None:
+        try:
+            processed_img = preprocess_image("brainTumor", image_stream, imageDecodePool, imageJpegDraft)
+        except Exception as e:
+            print(f"Error processing image data: {e}")
+            return "Image processing failed."
 
-    img_array = np.array(img)
-    img_array = np.expand_dims(img_array, axis=0) 
-    
-    processed_img = preprocess_input(img_array)
+        probabilities = np.array(brainTumorBatcher.predict(processed_img)[0])
+        imageCache.set(cacheKey, probabilities)
 
     class_indices = {'glioma': 0, 'meningioma': 1, 'notumor': 2, 'pituitary': 3}
     classes = sorted(class_indices, key=class_indices.get) 
 
-    predictions = brainTumorModel.predict(processed_img)
+    predictions = probabilities[np.newaxis]
     predicted_index = np.argmax(predictions[0])
     
     predicted_class = classes[predicted_index]
@@ -295,37 +324,31 @@ def brainTumor():
 
 @app.route("/skinCancer", methods=["POST"])
 def skinCancer():
-    data = request.json
-    
-    target_size = (150, 150)
-    base64_image_string = data.get('image')
-
-    if not base64_image_string:
-        return jsonify({"error": "'image' not found in input data."}), 400
+    registry.check("skinCancer")
 
     try:
-        if ';base64,' in base64_image_string:
-            _, base64_image_string = base64_image_string.split(';base64,')
-            
-        image_data = base64.b64decode(base64_image_string)
-    except Exception as e:
+        image_stream, digest = read_image_upload(request)
+    except ImageMissing:
+        return jsonify({"error": "'image' not found in input data."}), 400
+    except ImageDecodeError as e:
         print(f"Error decoding Base64: {e}")
         return jsonify({"error": "Base64 decoding failed."}), 400
 
-    try:
-        image_stream = io.BytesIO(image_data)
-        img = Image.open(image_stream).convert('RGB')
-        
-        img = img.resize(target_size)
-        img_array = np.array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        processed_img = img_array / 255.0
-    except Exception as e:
-        print(f"Error processing image data: {e}")
-        return jsonify({"error": "Image processing failed."}), 400
+    registry.refresh_if_due(modelWatchSeconds)
+    cacheKey = image_cache_key("skinCancer", digest)
+    probabilities = imageCache.get(cacheKey)
+    if probabilities is None:
+        try:
+            processed_img = preprocess_image("skinCancer", image_stream, imageDecodePool, imageJpegDraft)
+        except Exception as e:
+            print(f"Error processing image data: {e}")
+            return jsonify({"error": "Image processing failed."}), 400
 
     try:
-        prediction = skinCancerModel.predict(processed_img, verbose=0)
+        if probabilities is None:
+            probabilities = np.array(skinCancerBatcher.predict(processed_img)[0])
+            imageCache.set(cacheKey, probabilities)
+        prediction = probabilities[np.newaxis]
         
         malignant_probability = float(prediction[0][0])
         benign_probability = 1.0 - malignant_probability
@@ -369,6 +392,59 @@ def skinCancer():
     
     return report
 
+@app.route("/assistant/pcos", methods=["POST"])
+def pcos_assistant():
+    data = request.get_json(silent=True)
+    message = data.get("message") if isinstance(data, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        return jsonify({"error": "expected {\"message\": \"...\"} with an optional \"session_id\""}), 400
+    session_id = data.get("session_id") or secrets.token_urlsafe(16)
+    if not isinstance(session_id, str) or len(session_id) > 128:
+        return jsonify({"error": "session_id must be a string of at most 128 characters"}), 400
+
+    reply, updated, profile = assistantSessions.turn(session_id, lambda memory: pcosAssistant.respond(memory, message))
+    return jsonify({"session_id": session_id, "reply": reply, "updated": updated, "profile": profile})
+
+@app.route("/assistant/pcos/<session_id>", methods=["DELETE"])
+def end_pcos_session(session_id):
+    assistantSessions.discard(session_id)
+    return "", 204
+
+@app.route("/models")
+def models_status():
+    return jsonify(registry.status())
+
+@app.route("/metrics/cache")
+def cache_metrics():
+    return jsonify({"predictions": predictionCache.stats(), "images": imageCache.stats(), "dashboards": dashboardCache.stats()})
+
+@app.route("/metrics/sessions")
+def session_metrics():
+    return jsonify(assistantSessions.stats())
+
+@app.route("/metrics/workers")
+def worker_metrics():
+    return jsonify(inferencePool.stats() if inferencePool is not None else {"size": 0})
+
+@app.route("/metrics/memory")
+def memory_metrics():
+    # memory of the worker that answers; under gunicorn each request may land on a different one
+    usage = memory_usage()
+    usage.update({
+        "parent_pid": os.getppid(),
+        "gc_frozen_objects": gc.get_freeze_count(),
+        "models": [name for name, model in registry.status()["models"].items() if model["loaded"]],
+        "datasets": dashboardData.loaded
+    })
+    return jsonify(usage)
+
+@app.route("/metrics/batching")
+def batching_metrics():
+    return jsonify({
+        "brainTumor": brainTumorBatcher.stats(),
+        "skinCancer": skinCancerBatcher.stats()
+    })
+
 @app.route('/dashboards/pcos/<path:path>')
 def pcos_dash_route(path):
     return pcos_dash_app.index()
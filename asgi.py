@@ -0,0 +1,147 @@
+# ASGI entry point of the Python backend:
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000
+#
+# Request bodies are read on the event loop, and each request then waits for a slot of its model's
+# limiter (MODEL_CONCURRENCY / MODEL_QUEUE_SIZE / MODEL_QUEUE_TIMEOUT_MS). Only then does the Flask app
+# handle it, in a bounded thread pool (ASGI_THREADS), so a slow image model cannot take every thread
+# from the tabular models or the dashboards. A full queue is answered with 429, a request that waited
+# too long with 503, both with a Retry-After header.
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app, batch_models
+from inference.admission import ModelLimiter, Overloaded, QueueTimeout, parse_limits
+from inference.uploads import SPOOL_MAX_MEMORY
+
+MODEL_ROUTES = {
+    "/heartFailure": "heartFailure",
+    "/kidney": "kidney",
+    "/diabetes": "diabetes",
+    "/pcos": "pcos",
+    "/brainTumor": "brainTumor",
+    "/skinCancer": "skinCancer",
+}
+
+concurrencyLimits, defaultConcurrency = parse_limits(os.environ.get("MODEL_CONCURRENCY", "brainTumor=2,skinCancer=2"), 8)
+queueLimits, defaultQueueSize = parse_limits(os.environ.get("MODEL_QUEUE_SIZE"), 32)
+queueTimeout = float(os.environ.get("MODEL_QUEUE_TIMEOUT_MS", 10000)) / 1000 or None
+# requests that are not model predictions (dashboards, metrics, index) share the "default" limiter
+limiters = {
+    name: ModelLimiter(name, concurrencyLimits.get(name, defaultConcurrency), queueLimits.get(name, defaultQueueSize), queueTimeout)
+    for name in list(MODEL_ROUTES.values()) + ["default"]
+}
+executor = ThreadPoolExecutor(int(os.environ.get("ASGI_THREADS", 16)), thread_name_prefix="asgi")
+
+def limiter_for(path):
+    if path.startswith("/batch/") and path[len("/batch/"):] in batch_models:
+        return limiters[path[len("/batch/"):]]
+    return limiters[MODEL_ROUTES.get(path, "default")]
+
+def wsgi_environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": scope["client"][0] if scope.get("client") else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        # the body is already complete, so it can be read without a Content-Length (chunked uploads)
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        name = "HTTP_" + name
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+def call_wsgi(environ):
+    # runs in the thread pool; the whole response body is collected there too
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+    chunks = app.wsgi_app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+        environ["wsgi.input"].close()
+    return response["status"], response["headers"], body
+
+async def read_body(receive):
+    # large uploads go to a temporary file, like the octet-stream image path does
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            body.close()
+            return None
+        body.write(message.get("body", b""))
+        if not message.get("more_body"):
+            body.seek(0)
+            return body
+
+async def send_response(send, status, headers, body):
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+async def send_json(send, status, payload, headers=()):
+    await send_response(send, status, [(b"content-type", b"application/json"), *headers], json.dumps(payload).encode())
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    if scope["path"] == "/metrics/admission":
+        return await send_json(send, 200, {name: limiter.stats() for name, limiter in limiters.items()})
+
+    limiter = limiter_for(scope["path"])
+    body = None
+    try:
+        # a request that would be rejected anyway is rejected before its body is read
+        limiter.check()
+        body = await read_body(receive)
+        if body is None:
+            return
+        async with limiter.slot():
+            loop = asyncio.get_running_loop()
+            status, headers, content = await loop.run_in_executor(executor, call_wsgi, wsgi_environ(scope, body))
+    except (Overloaded, QueueTimeout) as e:
+        if body is not None:
+            body.close()
+        message = "too many queued" if isinstance(e, Overloaded) else "timed out waiting for"
+        return await send_json(send, e.status, {"error": f"{message} {limiter.name} requests"}, [(b"retry-after", b"1")])
+    await send_response(send, status, headers, content)
@@ -0,0 +1,124 @@
+# Clinic and lab search of the PCOS assistant (datasets/pcos/rag.py) on a synthetic directory. The
+# directory is written to CSV and to SQLite and loaded back from both, then the same queries (locations,
+# names, tests, prefixes and misspellings) are answered by the original linear scan and by DirectoryIndex.
+#
+#   python -m benchmarks.bench_assistant_directory --clinics 5000 --labs 5000
+import argparse
+import csv
+import importlib.util
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AREAS = ["Maadi", "Downtown", "Nasr City", "Heliopolis", "Zamalek", "Dokki", "Mohandessin", "New Cairo", "Sheikh Zayed",
+         "6th of October", "Shubra", "Helwan", "Giza", "Rehab", "Obour", "Mokattam", "Abbassia", "Garden City"]
+CITIES = ["Cairo", "Giza", "Alexandria"]
+NAME_WORDS = ["Lotus", "Amal", "Elite", "Nile", "Nour", "Shifa", "Hayat", "Salam", "Rahma", "Delta", "Pyramids", "Horus",
+              "Isis", "Cleopatra", "Royal", "Care", "Family", "Women's", "Fertility", "Hope", "Bloom", "Lily", "Jasmine"]
+SPECIALTIES = ["PCOS & Hormones", "IVF", "General Gyn", "Endocrinology", "Fertility", "Obstetrics"]
+TESTS = ["AMH", "Insulin", "Glucose", "Hormone Profile", "PCOS Panel", "Ultrasound", "Thyroid Panel", "Testosterone",
+         "Prolactin", "LH", "FSH", "Vitamin D", "Lipid Profile", "HbA1c"]
+QUERIES = ["maadi", "nasr city", "zamalek", "heliopolis", "amh", "insulin", "thyroid", "lotus", "shifa care",
+           "helio", "moka", "testost", "zamalk", "heliopolsi", "find a clinic in dokki", "general"]
+
+def load_rag():
+    spec = importlib.util.spec_from_file_location("pcos_assistant", os.path.join(ROOT, "datasets", "pcos", "rag.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_directory(clinics, labs, seed=0):
+    rng = random.Random(seed)
+
+    def place():
+        return f"{rng.choice(AREAS)} {rng.choice(CITIES)}" if rng.random() < 0.3 else rng.choice(AREAS)
+
+    clinic_rows = [{"id": i, "name": " ".join(rng.sample(NAME_WORDS, 2)) + " Clinic", "location": place(),
+                    "specialty": rng.choice(SPECIALTIES), "doctors": [f"Dr. {rng.choice(NAME_WORDS)} {i}"],
+                    "rating": round(rng.uniform(3, 5), 1)} for i in range(1, clinics + 1)]
+    lab_rows = [{"id": 100000 + i, "name": " ".join(rng.sample(NAME_WORDS, 2)) + " Labs", "location": place(),
+                 "tests": rng.sample(TESTS, rng.randint(2, 6)), "price_range": rng.choice(["$", "$$", "$$$"]),
+                 "rating": round(rng.uniform(3, 5), 1)} for i in range(1, labs + 1)]
+    return clinic_rows, lab_rows
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: "; ".join(v) if isinstance(v, list) else v for k, v in row.items()})
+
+def write_sqlite(path, table, rows):
+    connection = sqlite3.connect(path)
+    columns = list(rows[0])
+    connection.execute(f'CREATE TABLE "{table}" ({", ".join(columns)})')
+    connection.executemany(f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(columns))})',
+                           [["; ".join(v) if isinstance(v, list) else v for v in row.values()] for row in rows])
+    connection.commit()
+    connection.close()
+
+def scan_clinics(clinics, query):
+    # tool_search_clinics() before DirectoryIndex
+    query = query.lower()
+    return [c for c in clinics if query in c['location'].lower() or query in c['name'].lower()]
+
+def scan_labs(labs, query):
+    query = query.lower()
+    return [l for l in labs if query in l['location'].lower() or any(query in t.lower() for t in l['tests'])]
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clinics", type=int, default=5000)
+    parser.add_argument("--labs", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rag = load_rag()
+    clinic_rows, lab_rows = make_directory(args.clinics, args.labs)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"csv": (os.path.join(tmp, "clinics.csv"), os.path.join(tmp, "labs.csv")),
+                 "sqlite": (os.path.join(tmp, "directory.db"),) * 2}
+        write_csv(paths["csv"][0], clinic_rows)
+        write_csv(paths["csv"][1], lab_rows)
+        write_sqlite(paths["sqlite"][0], "clinics", clinic_rows)
+        write_sqlite(paths["sqlite"][0], "labs", lab_rows)
+        for source, (clinic_path, lab_path) in paths.items():
+            start = time.perf_counter()
+            clinics = rag.DirectoryIndex(rag.load_directory(clinic_path, "clinics", None), ("name", "location"))
+            labs = rag.DirectoryIndex(rag.load_directory(lab_path, "labs", None), ("name", "location", "tests"))
+            elapsed = time.perf_counter() - start
+            if clinics.records != clinic_rows or labs.records != lab_rows:
+                raise SystemExit(f"the directory loaded from {source} differs from the one written")
+            print(f"load + index from {source:<6} {elapsed * 1000:7.1f} ms   "
+                  f"{len(clinics.vocabulary) + len(labs.vocabulary)} distinct tokens")
+
+    print(f"{'query':<24} {'scan ms':>8} {'first ms':>9} {'index ms':>9} {'scan hits':>10}  top {args.limit} of the index")
+    total_scan = total_index = 0
+    for query in QUERIES:
+        scan_time, scanned = timed(lambda: (scan_clinics(clinic_rows, query), scan_labs(lab_rows, query)), args.repeat)
+        clinics.expand.cache_clear()
+        labs.expand.cache_clear()
+        # the first search of a query pays for its prefix and fuzzy lookups, later ones hit the expansion cache
+        search = lambda: (clinics.search(query, args.limit, rag.QUERY_STOP_WORDS), labs.search(query, args.limit, rag.QUERY_STOP_WORDS))
+        first_time, found = timed(search, 1)
+        index_time, found = timed(search, args.repeat)
+        total_scan += scan_time
+        total_index += index_time
+        names = ", ".join(r["name"] for r in found[0][:1] + found[1][:1])
+        print(f"{query:<24} {scan_time * 1000:8.2f} {first_time * 1000:9.3f} {index_time * 1000:9.3f} {len(scanned[0]) + len(scanned[1]):10d}  "
+              f"{len(found[0])}+{len(found[1])} ({names})")
+    print(f"{'all queries':<24} {total_scan * 1000:8.2f} {'':>9} {total_index * 1000:9.3f}   ({total_scan / total_index:.0f}x)")
+
+if __name__ == "__main__":
+    main()
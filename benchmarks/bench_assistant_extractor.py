@@ -0,0 +1,168 @@
+# Throughput of the PCOS assistant's message scanner (datasets/pcos/rag.py) on a synthetic chat corpus.
+# Each message is read as respond() reads it: profile fields plus intent keywords. Compared are the
+# original extractor (one regex / substring check per field and per intent), one `in` check per keyword
+# of the scanner's table, and MessageScanner's single compiled pass; all three must agree on every
+# message. Then the keyword lookup alone is timed with synthetic keywords added to the table, to show how
+# both approaches grow with it.
+#
+#   python -m benchmarks.bench_assistant_extractor --messages 200000
+import argparse
+import importlib.util
+import os
+import random
+import re
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SENTENCES = [
+    "My AMH is {amh}",
+    "amh: {amh} according to the latest lab report",
+    "I am {age} years old",
+    "{age} yrs, first time here",
+    "my cycle is irregular",
+    "periods are regular most months",
+    "I noticed some weight gain again",
+    "my weight has been high since last year",
+    "can you diagnose me?",
+    "do i have pcos?",
+    "what do my results mean",
+    "I want a lab test for hormones",
+    "please book a lab",
+    "find a clinic in {location}",
+    "is there a doctor near {location}",
+    "book a doctor for next week",
+]
+FILLER = [
+    "hello there",
+    "thanks for the help",
+    "I have been feeling tired lately",
+    "my sister told me to ask",
+    "sorry for the long message",
+    "I also get headaches sometimes",
+    "not sure if this is relevant",
+    "my mother had similar symptoms",
+]
+LOCATIONS = ["Maadi", "Downtown", "Nasr City", "Heliopolis", "Zamalek"]
+
+def load_rag():
+    spec = importlib.util.spec_from_file_location("pcos_assistant", os.path.join(ROOT, "datasets", "pcos", "rag.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_corpus(count, seed=0):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        parts = rng.sample(SENTENCES, rng.randint(0, 3)) + rng.sample(FILLER, rng.randint(0, 4))
+        rng.shuffle(parts)
+        text = ". ".join(parts).format(amh=round(rng.uniform(0.5, 60), 1), age=rng.randint(8, 65), location=rng.choice(LOCATIONS))
+        messages.append(text.upper() if rng.random() < 0.05 else text)
+    return messages
+
+def original_turn(text):
+    # extract_medical_data_smart() and the intent checks of respond() before MessageScanner
+    text = text.lower()
+    data = {}
+    amh_match = re.search(r'amh\s*(?:is|:)?\s*(\d+(\.\d+)?)', text)
+    if amh_match:
+        val = float(amh_match.group(1))
+        if 0 < val < 50:
+            data['AMH(ng/mL)'] = val
+    if 'irregular' in text: data['Cycle(R/I)'] = 4
+    elif 'regular' in text: data['Cycle(R/I)'] = 2
+    age_match = re.search(r'(\d+)\s*(?:years old|yrs|age)', text)
+    if age_match:
+        val = int(age_match.group(1))
+        if 10 < val < 60:
+            data['Age'] = val
+    if 'weight' in text and ('gain' in text or 'high' in text):
+        data['Weight gain(Y/N)'] = 1
+    diagnose = any(w in text for w in ['diagnose', 'predict', 'do i have', 'results', 'analysis'])
+    lab = 'lab' in text or 'test' in text
+    clinic = 'clinic' in text or 'doctor' in text
+    book = 'book' in text
+    location = next((loc for loc in ['maadi', 'downtown', 'nasr city'] if loc in text), "")
+    return data, (diagnose, lab, clinic, book, location)
+
+def intents(found, rag):
+    return (not found.isdisjoint(rag.DIAGNOSE_WORDS), 'lab' in found or 'test' in found,
+            'clinic' in found or 'doctor' in found, 'book' in found,
+            next((loc for loc in rag.CLINIC_LOCATIONS if loc in found), ""))
+
+def scanner_turn(rag):
+    scanner = rag.message_scanner
+
+    def turn(text):
+        data, found = scanner.scan(text.lower())
+        return data, intents(found, rag)
+    return turn
+
+def substring_turn(rag):
+    # the scanner's fields and keywords, but one substring check per keyword instead of one pass
+    scanner = rag.message_scanner
+
+    def turn(text):
+        text = text.lower()
+        found = set(filter(text.__contains__, scanner.keywords))
+        data = {}
+        for field, anchors, read in scanner.fields:
+            if not anchors.isdisjoint(found):
+                value = read(text, found)
+                if value is not None:
+                    data[field] = value
+        return data, intents(found, rag)
+    return turn
+
+def synthetic_keywords(count, seed=0):
+    rng = random.Random(seed)
+    return tuple("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10))) for _ in range(count))
+
+def measure(turn, messages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in messages:
+            turn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--extra-keywords", default="0,20,80,200", help="table sizes for the keyword lookup timing")
+    args = parser.parse_args()
+
+    rag = load_rag()
+    messages = make_corpus(args.messages)
+    chars = sum(map(len, messages))
+    print(f"{len(messages)} messages, {chars / len(messages):.0f} characters on average")
+
+    turns = [("original", original_turn), ("substring checks", substring_turn(rag)), ("MessageScanner", scanner_turn(rag))]
+    expected = [original_turn(text) for text in messages]
+    for name, turn in turns[1:]:
+        mismatches = sum(turn(text) != result for text, result in zip(messages, expected))
+        if mismatches:
+            raise SystemExit(f"{name} disagrees with the original extractor on {mismatches} messages")
+
+    for name, turn in turns:
+        elapsed = measure(turn, messages, args.repeat)
+        print(f"{name:<17} {elapsed / len(messages) * 1e6:6.2f} us/message   {len(messages) / elapsed:9.0f} messages/s   "
+              f"{chars / elapsed / 2**20:6.1f} MB/s")
+
+    lowered = [text.lower() for text in messages]
+    print(f"\n{'keywords':>8} {'substring us':>13} {'one pass us':>12}")
+    for extra in map(int, args.extra_keywords.split(",")):
+        scanner = rag.MessageScanner(rag.MESSAGE_FIELDS, rag.MESSAGE_KEYWORDS + synthetic_keywords(extra))
+        keywords = scanner.keywords
+        substring = lambda text: set(filter(text.__contains__, keywords))
+        one_pass = lambda text: set().union(*map(scanner.prefixes.__getitem__, scanner.findall(text)))
+        if any(substring(text) != one_pass(text) for text in lowered):
+            raise SystemExit(f"the one-pass lookup disagrees with substring checks for {len(keywords)} keywords")
+        timings = [measure(lookup, lowered, args.repeat) / len(lowered) * 1e6 for lookup in (substring, one_pass)]
+        print(f"{len(keywords):8d} {timings[0]:13.2f} {timings[1]:12.2f}")
+
+if __name__ == "__main__":
+    main()
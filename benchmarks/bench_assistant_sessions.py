@@ -0,0 +1,96 @@
+# Throughput and memory of the PCOS assistant's session store (datasets/pcos/rag.py). Several threads
+# run short conversations (three turns each, every one on its own session) through SessionStore and
+# respond(), in memory only and with SQLite persistence. Then the Python memory held by 10k open
+# sessions is compared with the original dict-based profile.
+#
+#   python -m benchmarks.bench_assistant_sessions --threads 8 --sessions 20000
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CONVERSATION = [
+    "Hi, my AMH is 7.2 and I am 29 years old",
+    "my cycle is irregular and I have weight gain",
+    "find a clinic in maadi",
+]
+
+def load_rag():
+    spec = importlib.util.spec_from_file_location("pcos_assistant", os.path.join(ROOT, "datasets", "pcos", "rag.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class DictSessionMemory:
+    # what SessionMemory was before it used __slots__
+    def __init__(self):
+        self.user_profile = {
+            'Age': None,
+            'AMH(ng/mL)': None,
+            'Cycle(R/I)': None,
+            'Follicle No. (L)': None,
+            'Follicle No. (R)': None,
+            'Weight gain(Y/N)': None
+        }
+        self.history = []
+
+    def update(self, new_data):
+        for key, value in new_data.items():
+            if value is not None:
+                self.user_profile[key] = value
+
+def converse(rag, store, session_ids):
+    for session_id in session_ids:
+        for message in CONVERSATION:
+            store.turn(session_id, lambda memory: rag.respond(memory, message))
+
+def throughput(rag, threads, sessions, db_path=None):
+    store = rag.SessionStore(maxsize=sessions, ttl=1800, db_path=db_path)
+    ids = [f"session-{i}" for i in range(sessions)]
+    workers = [threading.Thread(target=converse, args=(rag, store, ids[i::threads])) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sessions / (time.perf_counter() - start)
+
+def session_memory(rag, memory_class, count=10000):
+    data = rag.extract_medical_data_smart(CONVERSATION[0] + " " + CONVERSATION[1])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = {}
+    for i in range(count):
+        memory = memory_class()
+        memory.update(data)
+        sessions[f"session-{i}"] = memory
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=20000)
+    args = parser.parse_args()
+
+    rag = load_rag()
+    rate = throughput(rag, args.threads, args.sessions)
+    print(f"in memory  {rate:8.0f} sessions/s   {rate * len(CONVERSATION):8.0f} turns/s")
+    with tempfile.TemporaryDirectory() as tmp:
+        rate = throughput(rag, args.threads, args.sessions, os.path.join(tmp, "sessions.db"))
+    print(f"sqlite     {rate:8.0f} sessions/s   {rate * len(CONVERSATION):8.0f} turns/s")
+
+    for name, memory_class in (("dict profile", DictSessionMemory), ("__slots__", rag.SessionMemory)):
+        size = session_memory(rag, memory_class)
+        print(f"{name:<13} {size / 2**20:6.2f} MB per 10k sessions ({size / 10000:.0f} B each, ids included)")
+
+if __name__ == "__main__":
+    main()
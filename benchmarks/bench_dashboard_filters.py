@@ -0,0 +1,59 @@
+# Filtering the heart dashboard table: ANDed df[col].isin(...) masks (the original filtersEffect)
+# against BitmapIndex, cold and memoized, on the table replicated to a larger patient count.
+#
+#   python -m benchmarks.bench_dashboard_filters --rows 1000000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboards.bitmap import BitmapIndex
+
+COLUMNS = ['ChestPainType', 'RestingECG', 'ST_Slope', 'HeartDisease', 'Sex', 'FastingBS', 'ExerciseAngina']
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    base = pd.read_csv(os.path.join(ROOT, "dashboards", "heart_dashboard.csv"))
+    df = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).iloc[:args.rows]
+    start = time.perf_counter()
+    index = BitmapIndex(df, COLUMNS, cache_size=0)
+    print(f"{len(df)} rows, index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # every value selected except one chest pain type and one ECG result
+    filters = {col: list(df[col].unique()) for col in COLUMNS}
+    filters['ChestPainType'] = filters['ChestPainType'][1:]
+    filters['RestingECG'] = filters['RestingECG'][1:]
+
+    def isin_masks():
+        mask = np.ones(len(df), dtype=bool)
+        for col, values in filters.items():
+            mask &= df[col].isin(values).to_numpy()
+        return np.flatnonzero(mask)
+
+    assert np.array_equal(isin_masks(), index.select(filters))
+    memoized = BitmapIndex(df, COLUMNS)
+    memoized.select(filters)
+    print(f"isin masks       {timed(isin_masks, args.repeat):8.2f} ms")
+    print(f"bitmap, cold     {timed(lambda: index.select(filters), args.repeat):8.2f} ms")
+    print(f"bitmap, memoized {timed(lambda: memoized.select(filters), args.repeat):8.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# Startup cost of the dashboard datasets, each mode measured in a fresh process: parsing the CSVs
+# against memory-mapping the Feather copies made by `python -m tools.convert_datasets`. Reports
+# load time, RSS added by the loaded frames and their in-memory size.
+#
+#   python -m benchmarks.bench_dataset_loading
+import multiprocessing
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def _load(mode, queue):
+    import pandas as pd
+    from dashboards.data import DATASETS, csv_path, feather_path, read_feather
+    from inference.registry import current_rss_bytes
+
+    rss = current_rss_bytes()
+    start = time.perf_counter()
+    frames = {}
+    for name in DATASETS:
+        frames[name] = pd.read_csv(csv_path(name)) if mode == "csv" else read_feather(feather_path(name))
+    elapsed = time.perf_counter() - start
+    size = sum(df.memory_usage(deep=True).sum() for df in frames.values())
+    queue.put((elapsed, current_rss_bytes() - rss, size))
+
+def measure(mode):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_load, args=(mode, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main():
+    for mode in ("csv", "feather"):
+        elapsed, rss, size = measure(mode)
+        print(f"{mode:<8} load {elapsed * 1000:7.1f} ms   RSS +{rss / 2**20:6.1f} MB   frames {size / 2**20:5.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Latency and JSON payload of the diabetes dashboard callbacks: the original versions (boolean masks
+# over the 100k rows, px.box/px.histogram with every raw point) against the RangeCube versions.
+#
+#   python -m benchmarks.bench_diabetes_dashboard
+import json
+import os
+import sys
+import time
+
+import plotly.express as px
+import plotly.utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboards import diabetes
+
+df = diabetes.df
+
+def original_box_plot(selected_var, age_range):
+    filtered_df = df[(df['age'] >= age_range[0]) & (df['age'] <= age_range[1])]
+    return px.box(filtered_df, x='diabetes', y=selected_var, color='diabetes', template='plotly_white')
+
+def original_chart(smoke_value, age_range):
+    filtered = df[(df['smoking_history'] == smoke_value) & (df['age'] >= age_range[0]) & (df['age'] <= age_range[1])]
+    return px.histogram(filtered, x='age', color='diabetes', barmode='group', template='plotly_white')
+
+def run(fn, args, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # what Dash does with a callback's return value
+        payload = json.dumps(fn(*args), cls=plotly.utils.PlotlyJSONEncoder)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000, len(payload)
+
+def main():
+    age_range = [diabetes.min_age, diabetes.max_age]
+    cases = [
+        ("box plot", original_box_plot, diabetes.update_box_plot, ('bmi', age_range)),
+        ("histogram", original_chart, diabetes.update_chart, ('never', age_range)),
+    ]
+    print("median callback time including figure serialization, full age range")
+    for name, original, cube, args in cases:
+        old_ms, old_bytes = run(original, args)
+        new_ms, new_bytes = run(cube, args)
+        print(f"{name:<10} original {old_ms:8.1f} ms {old_bytes / 1024:9.1f} KB   cube {new_ms:6.1f} ms {new_bytes / 1024:6.1f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Peak Python memory of turning one uploaded image into the resized PIL image, for the original
+# JSON/base64 path and the upload paths in inference/uploads.py (JSON, multipart, octet-stream).
+# tracemalloc only sees Python allocations, so PIL's pixel buffers (the same for every path) are
+# not part of the numbers. First, the JSON path is checked against json.loads on small bodies in other
+# shapes (nested, repeated or escaped keys, truncated bodies, arrays), which must fall back to it.
+#
+#   python -m benchmarks.bench_image_upload --size 2048
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+from flask import Flask, request
+from PIL import Image
+from werkzeug.exceptions import BadRequest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference.uploads import read_image_upload
+
+JSON_BODIES = [
+    b'{"image": "QUJD"}',
+    b' \r\n{ "image" : "data:image/png;base64,QUJD" ,\n "name": "x.png" }\n',
+    b'{"meta": {"image": "QUJD"}, "image": "WFla"}',
+    b'{"image": "QUJD", "image": "WFla"}',
+    b'{"image": "QUJ\\u0044"}',
+    b'{"image": "QUJD"',
+    b'{"image": "QUJD", "name": ',
+    b'[{"image": "QUJD"}]',
+    b'{"image": ""}',
+    b'{"image": 1}',
+    b'{"name": "QUJD"}',
+]
+
+def make_jpeg(size):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG", quality=95)
+    return buf.getvalue()
+
+def original_path():
+    # what brainTumor()/skinCancer() did before
+    data = request.json
+    base64_image_string = data.get('image')
+    if ';base64,' in base64_image_string:
+        _, base64_image_string = base64_image_string.split(';base64,')
+    image_data = base64.b64decode(base64_image_string)
+    image_stream = io.BytesIO(image_data)
+    return Image.open(image_stream).convert('RGB').resize((224, 224))
+
+def upload_path():
+    image_stream, _ = read_image_upload(request)
+    return Image.open(image_stream).convert('RGB').resize((224, 224))
+
+def json_image(body):
+    # what json.loads makes of the body: the decoded image, or None when it is rejected
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    value = data.get("image") if isinstance(data, dict) else None
+    if not value or not isinstance(value, str):
+        return None
+    return base64.b64decode(value.split(";base64,")[-1])
+
+def check_json_bodies(app):
+    for body in JSON_BODIES:
+        with app.test_request_context("/", method="POST", data=body, content_type="application/json"):
+            try:
+                image = read_image_upload(request)[0].read()
+            except (ValueError, BadRequest):
+                image = None
+        if image != json_image(body):
+            raise SystemExit(f"the JSON upload path reads {image!r} from {body!r}, json.loads {json_image(body)!r}")
+    print(f"JSON upload path agrees with json.loads on {len(JSON_BODIES)} bodies")
+
+def measure(app, decode, **request_kwargs):
+    with app.test_request_context("/", method="POST", **request_kwargs):
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        decode()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=2048, help="side of the random test image in pixels")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    check_json_bodies(app)
+    jpeg = make_jpeg(args.size)
+    data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode()
+    decoded_pixels = args.size * args.size * 3
+    print(f"JPEG {len(jpeg) / 2**20:.2f} MB, base64 body {len(data_url) / 2**20:.2f} MB, decoded pixels {decoded_pixels / 2**20:.2f} MB")
+
+    cases = [
+        ("json, original", original_path, {"json": {"image": data_url}}),
+        ("json, uploads", upload_path, {"json": {"image": data_url}}),
+        ("multipart", upload_path, {"data": {"image": (io.BytesIO(jpeg), "image.jpg")}, "content_type": "multipart/form-data"}),
+        ("octet-stream", upload_path, {"data": jpeg, "content_type": "application/octet-stream"}),
+    ]
+    for name, decode, kwargs in cases:
+        peak = measure(app, decode, **kwargs)
+        print(f"{name:<16} peak {peak / 2**20:7.2f} MB  ({peak / len(jpeg):.1f}x the JPEG)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Time to turn an uploaded JPEG into the model input batch: the original PIL path (full decode,
+# convert, resize, float64/astype copies) against inference/preprocessing.py with and without
+# reduced-size JPEG decoding, and decoding a batch in a thread pool. Also prints the largest
+# pixel difference to the original path, since draft decoding is not bit-identical.
+#
+#   python -m benchmarks.bench_preprocessing --width 4032 --height 3024
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference.preprocessing import IMAGE_SPECS, preprocess_image, preprocess_images
+
+def make_photo(width, height, seed=0):
+    # smooth gradients plus some noise, closer to a photo than pure noise
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    channels = [127 + 100 * np.sin(x / rng.uniform(50, 400) + y / rng.uniform(50, 400) + c) for c in range(3)]
+    pixels = np.stack(channels, axis=-1) + rng.normal(0, 8, (height, width, 3))
+    buf = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+def original_path(name, data):
+    # what brainTumor()/skinCancer() did before
+    img = Image.open(io.BytesIO(data)).convert('RGB')
+    img = img.resize(IMAGE_SPECS[name]["size"])
+    img_array = np.expand_dims(np.array(img), axis=0)
+    if name == "skinCancer":
+        return img_array / 255.0
+    return img_array.astype(np.float32)
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, sorted(times)[len(times) // 2] * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=8, help="images per batch for the thread pool run")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    photos = [make_photo(args.width, args.height, seed) for seed in range(args.batch)]
+    print(f"{args.width}x{args.height} JPEG, {len(photos[0]) / 2**20:.2f} MB, median of {args.repeat} runs")
+    pool = ThreadPoolExecutor(args.threads)
+
+    for name in IMAGE_SPECS:
+        data = photos[0]
+        reference, base_ms = timed(lambda: original_path(name, data), args.repeat)
+        full, full_ms = timed(lambda: preprocess_image(name, io.BytesIO(data), draft=False), args.repeat)
+        draft, draft_ms = timed(lambda: preprocess_image(name, io.BytesIO(data)), args.repeat)
+        scale = 255.0 if name == "skinCancer" else 1.0
+        print(f"\n{name} {IMAGE_SPECS[name]['size']}")
+        print(f"  original          {base_ms:8.1f} ms")
+        print(f"  full decode       {full_ms:8.1f} ms  max diff {np.abs(full - reference).max() * scale:.2f} / 255")
+        print(f"  draft decode      {draft_ms:8.1f} ms  max diff {np.abs(draft - reference).max() * scale:.2f} / 255, "
+              f"mean {np.abs(draft - reference).mean() * scale:.3f}")
+
+        _, serial_ms = timed(lambda: preprocess_images(name, [io.BytesIO(p) for p in photos]), max(1, args.repeat // 2))
+        _, pooled_ms = timed(lambda: preprocess_images(name, [io.BytesIO(p) for p in photos], pool), max(1, args.repeat // 2))
+        print(f"  batch of {args.batch}, serial  {serial_ms:8.1f} ms")
+        print(f"  batch of {args.batch}, {args.threads} threads {pooled_ms:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
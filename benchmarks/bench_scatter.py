@@ -0,0 +1,46 @@
+# Time and JSON payload of a dashboard scatter plot on a large synthetic patient table: plain
+# px.scatter against dashboards/scatter.py with downsampling and with server-side binning.
+#
+#   python -m benchmarks.bench_scatter --rows 1000000 --max-points 20000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboards import scatter
+
+def timed_payload(make):
+    start = time.perf_counter()
+    payload = make().to_json()
+    return (time.perf_counter() - start) * 1000, len(payload)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--max-points", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Age": rng.normal(55, 12, args.rows).round(),
+        "Cholesterol": rng.gamma(9, 25, args.rows),
+        "HeartDisease": rng.integers(0, 2, args.rows),
+    })
+    scatter.maxPoints = args.max_points
+    cases = [("px.scatter", lambda: px.scatter(df, x="Age", y="Cholesterol", color="HeartDisease"))]
+    for mode in ("sample", "heatmap"):
+        cases.append((mode, lambda mode=mode: (setattr(scatter, "overflowMode", mode), scatter.scatter(df, "Age", "Cholesterol", color="HeartDisease"))[1]))
+    print(f"{args.rows} rows, point budget {args.max_points}")
+    for name, make in cases:
+        ms, size = timed_payload(make)
+        print(f"{name:<12} {ms:8.0f} ms {size / 2**20:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Load test of the Flask development server (what `python app.py` runs) against the ASGI entry point
+# (`uvicorn asgi:application`). Each server is started in its own process, then hit by --concurrency
+# keep-alive clients for --duration seconds. Reports req/s, p50/p99 latency and the status codes seen
+# (429/503 are requests shed by the ASGI limiters).
+#
+#   python -m benchmarks.load_test --endpoint diabetes --concurrency 32 --duration 10
+import argparse
+import base64
+import http.client
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "flask": lambda port: [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port)],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi:application", "--port", str(port), "--log-level", "warning"],
+}
+
+TABULAR_PAYLOADS = {
+    "diabetes": {"gender": "female", "age": 50, "hypertension": "no", "heart_disease": "no", "smoking_history": "never",
+                 "bmi": 30, "HbA1c_level": 7.5, "blood_glucose_level": 200},
+    "kidney": {"Bp": 80, "Sg": 1.02, "Al": 1, "Su": 0, "Rbc": 1, "Bu": 36, "Sc": 1.2, "Sod": 137, "Pot": 4.6, "Hemo": 15.4,
+               "Wbcc": 7800, "Rbcc": 5.2, "Htn": "no"},
+}
+
+def make_image_payload(size=512):
+    from PIL import Image
+    pixels = np.random.default_rng(0).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG", quality=90)
+    return {"image": "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()}
+
+def payload_for(endpoint):
+    if endpoint in ("brainTumor", "skinCancer"):
+        return make_image_payload()
+    return TABULAR_PAYLOADS[endpoint]
+
+def wait_until_up(port, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/models")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("server did not start")
+
+def client(port, path, body, stop, latencies, statuses, lock):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    headers = {"Content-Type": "application/json"}
+    mine, seen = [], Counter()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            seen[response.status] += 1
+        except (OSError, http.client.HTTPException) as e:
+            seen[type(e).__name__] += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            continue
+        mine.append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        latencies.extend(mine)
+        statuses.update(seen)
+
+def run_load(port, path, body, concurrency, duration):
+    stop = threading.Event()
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    threads = [threading.Thread(target=client, args=(port, path, body, stop, latencies, statuses, lock)) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, np.array(latencies), statuses
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoint", default="diabetes", choices=sorted(TABULAR_PAYLOADS) + ["brainTumor", "skinCancer"])
+    parser.add_argument("--servers", default="flask,asgi")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5100)
+    args = parser.parse_args()
+
+    body = json.dumps(payload_for(args.endpoint))
+    for i, name in enumerate(args.servers.split(",")):
+        port = args.port + i
+        # every request runs the model instead of hitting the prediction cache
+        env = dict(os.environ, WARMUP_MODELS=os.environ.get("WARMUP_MODELS", args.endpoint),
+                   PREDICTION_CACHE_SIZE=os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+        process = subprocess.Popen(SERVERS[name](port), cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_up(port, process)
+            run_load(port, "/" + args.endpoint, body, min(args.concurrency, 4), 1)
+            elapsed, latencies, statuses = run_load(port, "/" + args.endpoint, body, args.concurrency, args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (float("nan"), float("nan"))
+        print(f"{name:<6} {len(latencies) / elapsed:8.1f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   "
+              f"statuses {dict(sorted(statuses.items(), key=str))}")
+
+if __name__ == "__main__":
+    main()
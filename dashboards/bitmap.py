@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from inference.cache import LRUCache
+
+class BitmapIndex:
+    # One packed bit vector per (column, value), built once. A filter {column: selected values} is the
+    # AND over columns of the OR of the selected values' vectors, i.e. the same rows as ANDing
+    # df[column].isin(values) masks. The resulting row ids are memoized by the filter signature.
+
+    def __init__(self, df, columns, cache_size=256):
+        self.size = len(df)
+        self.columns = list(columns)
+        self._bits = {}
+        for col in self.columns:
+            codes, values = pd.factorize(df[col], use_na_sentinel=False)
+            bits = np.packbits(codes[None, :] == np.arange(len(values))[:, None], axis=1)
+            self._bits[col] = {value: bits[i] for i, value in enumerate(values)}
+        self._empty = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._cache = LRUCache(maxsize=cache_size)
+
+    @staticmethod
+    def signature(filters):
+        return tuple(sorted((col, frozenset(values)) for col, values in filters.items()))
+
+    def mask(self, filters):
+        # packed bit vector of the rows matching every column's selection
+        result = None
+        for col, values in filters.items():
+            vectors = self._bits[col]
+            selected = self._empty.copy()
+            for value in values:
+                bits = vectors.get(value)
+                if bits is not None:
+                    np.bitwise_or(selected, bits, out=selected)
+            result = selected if result is None else np.bitwise_and(result, selected, out=result)
+        if result is None:
+            return np.packbits(np.ones(self.size, dtype=bool))
+        return result
+
+    def select(self, filters):
+        # sorted row positions matching the filters; None / missing selections match nothing, like isin([])
+        filters = {col: () if values is None else values for col, values in filters.items()}
+        key = self.signature(filters)
+        rows = self._cache.get(key)
+        if rows is None:
+            rows = np.flatnonzero(np.unpackbits(self.mask(filters), count=self.size))
+            self._cache.set(key, rows)
+        return rows
+
+    def filter(self, df, filters):
+        return df.take(self.select(filters))
+
+    def stats(self):
+        return self._cache.stats()
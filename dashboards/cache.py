@@ -0,0 +1,200 @@
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import plotly.utils
+
+from inference.cache import LRUCache
+from inference.registry import file_signature
+
+# Memoizes dashboard callbacks (filtered frames and finished figures) by dashboard, data version and
+# normalized arguments. The in-process tier is an LRUCache. Figures are also written, as JSON, to an
+# optional shared tier so other workers and restarts can reuse them: DASHBOARD_CACHE_URL set to
+# sqlite:///path/to/cache.db or redis://host:port/db.
+
+def normalize(value, as_set=False):
+    # hashable, order-insensitive form of callback arguments; lists inside dicts are filter
+    # selections, so their order does not matter
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), normalize(v, as_set=True)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        items = [normalize(v) for v in value]
+        return tuple(sorted(items, key=repr)) if as_set else tuple(items)
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+class SQLiteTier:
+    name = "sqlite"
+
+    def __init__(self, path, maxsize=10000, ttl=None):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._local = threading.local()
+        self._writes = 0
+        # closed again at once: the tier is created at import, which under gunicorn is in the master
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)")
+        conn.commit()
+        conn.close()
+
+    def _connection(self):
+        # one per thread and per process; SQLite connections must not be used across fork, so a
+        # forked worker opens its own instead of one inherited from the master
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5)
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        now = time.time()
+        if expires is not None and expires < now:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return value
+
+    def set(self, key, value):
+        conn = self._connection()
+        now = time.time()
+        expires = now + self.ttl if self.ttl else None
+        conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, value, expires, now))
+        self._writes += 1
+        if self.maxsize and self._writes % 100 == 0:
+            # drops the least recently used rows above maxsize
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+        conn.commit()
+
+    def stats(self):
+        entries = self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"backend": self.name, "path": self.path, "entries": entries, "maxsize": self.maxsize, "evictions": self.evictions}
+
+class RedisTier:
+    # anything that speaks the Redis protocol; eviction is left to the server's maxmemory policy
+    name = "redis"
+
+    def __init__(self, url, ttl=None):
+        import redis
+        self.url = url
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self.client.get("dash:" + key)
+        return None if value is None else value.decode()
+
+    def set(self, key, value):
+        self.client.set("dash:" + key, value, ex=int(self.ttl) if self.ttl else None)
+
+    def stats(self):
+        info = self.client.info("stats")
+        return {"backend": self.name, "url": self.url, "evicted_keys": info.get("evicted_keys")}
+
+def shared_tier(url, maxsize=10000, ttl=None):
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteTier(url[len("sqlite:///"):], maxsize, ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTier(url, ttl)
+    raise ValueError(f"Unsupported DASHBOARD_CACHE_URL {url!r}, use sqlite:///path or redis://host:port/db")
+
+class DashboardCache:
+
+    def __init__(self, maxsize=256, ttl=None, shared=None):
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+        self.versions = {}
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    def register(self, dashboard, *data_files):
+        # cached results of a dashboard are only reused while its data files are unchanged
+        self.versions[dashboard] = repr([file_signature(path) for path in data_files])
+
+    def _key(self, dashboard, name, args):
+        return (dashboard, self.versions.get(dashboard), name, normalize(args))
+
+    def _shared_key(self, key):
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _shared_get(self, key):
+        try:
+            value = self.shared.get(self._shared_key(key))
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"Dashboard cache read failed: {e}")
+            return None
+        if value is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        return json.loads(value)
+
+    def _shared_set(self, key, value):
+        try:
+            self.shared.set(self._shared_key(key), json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder))
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"Dashboard cache write failed: {e}")
+
+    def memoize(self, dashboard, shared=True):
+        # shared=False keeps results in this process only (e.g. DataFrames, which are not JSON)
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args):
+                key = self._key(dashboard, fn.__name__, args)
+                value = self.memory.get(key)
+                if value is not None:
+                    return value
+                if shared and self.shared is not None:
+                    value = self._shared_get(key)
+                if value is None:
+                    value = fn(*args)
+                    if shared and self.shared is not None:
+                        self._shared_set(key, value)
+                self.memory.set(key, value)
+                return value
+            return wrapper
+        return decorator
+
+    def stats(self):
+        stats = {"memory": self.memory.stats(), "shared": None}
+        if self.shared is not None:
+            try:
+                shared = self.shared.stats()
+            except Exception as e:
+                shared = {"error": str(e)}
+            shared.update({"hits": self.shared_hits, "misses": self.shared_misses, "errors": self.shared_errors})
+            stats["shared"] = shared
+        return stats
+
+dashboardCache = DashboardCache(
+    maxsize=int(os.environ.get("DASHBOARD_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("DASHBOARD_CACHE_TTL", 3600)) or None,
+    shared=shared_tier(
+        os.environ.get("DASHBOARD_CACHE_URL"),
+        maxsize=int(os.environ.get("DASHBOARD_CACHE_SHARED_SIZE", 10000)),
+        ttl=float(os.environ.get("DASHBOARD_CACHE_TTL", 3600)) or None
+    )
+)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+class RangeCube:
+    # Pre-aggregates a dataframe over the sorted distinct values of one column (e.g. age) so that a
+    # [lo, hi] range filter is answered from two prefix-sum rows instead of scanning every row.
+    # counts(): rows per group per distinct value, for pre-binned histograms.
+    # box(): exact box plot statistics of a value column per group, from prefix sums of value counts.
+
+    def __init__(self, df, range_col, group_cols, value_cols=(), box_group=None):
+        self.range_col = range_col
+        self.keys = np.unique(df[range_col].to_numpy())
+        position = np.searchsorted(self.keys, df[range_col].to_numpy())
+
+        # rows per (group, distinct range value)
+        self.group_cols = list(group_cols)
+        if len(self.group_cols) > 1:
+            groups = pd.MultiIndex.from_frame(df[self.group_cols])
+        else:
+            groups = df[self.group_cols[0]]
+        codes, uniques = pd.factorize(groups, sort=True)
+        self.groups = list(uniques)
+        self._group_index = {g: i for i, g in enumerate(self.groups)}
+        counts = np.zeros((len(self.groups), len(self.keys)), dtype=np.int64)
+        np.add.at(counts, (codes, position), 1)
+        self._counts = counts
+
+        # value counts per (box group, value column) as prefix sums over the range values
+        self.box_group = box_group
+        self.box_groups = list(np.unique(df[box_group])) if box_group else [None]
+        self._values = {}
+        for col in value_cols:
+            for g in self.box_groups:
+                rows = df[box_group].to_numpy() == g if box_group else slice(None)
+                values, value_codes = np.unique(df[col].to_numpy()[rows], return_inverse=True)
+                table = np.zeros((len(self.keys) + 1, len(values)), dtype=np.int32)
+                np.add.at(table, (position[rows] + 1, value_codes), 1)
+                self._values[(col, g)] = (values, np.cumsum(table, axis=0, out=table))
+
+    def _span(self, lo, hi):
+        return np.searchsorted(self.keys, lo, "left"), np.searchsorted(self.keys, hi, "right")
+
+    def counts(self, group, lo, hi):
+        # (distinct range values, row counts) inside [lo, hi] for one group
+        start, end = self._span(lo, hi)
+        i = self._group_index.get(group)
+        if i is None:
+            return self.keys[start:end], np.zeros(max(end - start, 0), dtype=np.int64)
+        return self.keys[start:end], self._counts[i, start:end]
+
+    def value_counts(self, col, group, lo, hi):
+        values, prefix = self._values[(col, group)]
+        start, end = self._span(lo, hi)
+        return values, prefix[end] - prefix[start]
+
+    def box(self, col, group, lo, hi):
+        # quartiles, fences and extremes computed the way plotly.js does for a box of raw points
+        # (quartilemethod 'linear'), or None if the range is empty
+        values, counts = self.value_counts(col, group, lo, hi)
+        present = counts > 0
+        values, counts = values[present], counts[present]
+        n = int(counts.sum())
+        if n == 0:
+            return None
+        cumulative = np.cumsum(counts)
+        kth = lambda k: values[np.searchsorted(cumulative, k, "right")]
+
+        def interp(p):
+            pos = p * n - 0.5
+            if pos < 0:
+                return kth(0)
+            if pos > n - 1:
+                return kth(n - 1)
+            frac = pos % 1
+            return frac * kth(int(np.ceil(pos))) + (1 - frac) * kth(int(np.floor(pos)))
+
+        q1, median, q3 = interp(0.25), interp(0.5), interp(0.75)
+        iqr = q3 - q1
+        lower = values[min(np.searchsorted(values, q1 - 1.5 * iqr, "left"), len(values) - 1)]
+        upper = values[max(np.searchsorted(values, q3 + 1.5 * iqr, "right") - 1, 0)]
+        return {
+            "count": n,
+            "q1": float(q1),
+            "median": float(median),
+            "q3": float(q3),
+            "lowerfence": float(min(q1, lower)),
+            "upperfence": float(max(q3, upper)),
+            "min": float(values[0]),
+            "max": float(values[-1]),
+        }
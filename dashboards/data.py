@@ -0,0 +1,95 @@
+import os
+import shutil
+
+import pandas as pd
+
+from common.files import file_sha256
+
+# The dashboard datasets are read from Arrow/Feather copies made by `python -m tools.convert_datasets`,
+# memory-mapped and with categorical / narrow numeric dtypes. A copy is only used if it was made from
+# the current CSV (its sha256 is stored in the file) and pyarrow is installed; otherwise the CSV is parsed.
+
+DASHBOARDS_DIR = os.path.dirname(os.path.abspath(__file__))
+FEATHER_DIR = os.path.join(DASHBOARDS_DIR, "data")
+
+# The mapped columns are read-only views of the file, so every process (e.g. gunicorn workers) that
+# loads a dataset shares the same page-cache pages instead of holding its own copy. DASHBOARD_SHM_DIR
+# (e.g. /dev/shm/smart-hospital) stages the copies in shared memory first, so those pages are never
+# evicted and re-read from disk.
+shmDir = os.environ.get("DASHBOARD_SHM_DIR") or None
+loaded = {}
+
+DATASETS = {
+    "heart": "heart_dashboard.csv",
+    "kidney": "kidney.csv",
+    "pcos": "pcos_dashboard.csv",
+    "diabetes": "diabetes_prediction_dataset.csv",
+}
+
+def csv_path(name):
+    return os.path.join(DASHBOARDS_DIR, DATASETS[name])
+
+def feather_path(name):
+    return os.path.join(FEATHER_DIR, f"{name}.feather")
+
+def optimize_dtypes(df):
+    # strings become categoricals (sorted categories, so groupby keeps the order it has on strings)
+    # and integers the smallest integer type. Floats stay float64: means and medians computed in
+    # float32 would change the numbers the dashboards show.
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_integer_dtype(values):
+            df[col] = pd.to_numeric(values, downcast="integer")
+        elif not pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            df[col] = pd.Categorical(values, categories=sorted(values.dropna().unique()))
+    return df
+
+def read_feather(path, source_sha256=None):
+    # memory-maps an Arrow IPC file; returns None if it is missing or was made from another CSV
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    try:
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    if source_sha256 is not None and metadata.get(b"source_sha256", b"").decode() != source_sha256:
+        print(f"{os.path.basename(path)} is out of date, reading the CSV instead")
+        return None
+    return table.to_pandas(split_blocks=True)
+
+def shared_copy(path, directory):
+    # copies path into directory unless the copy there has the same size and mtime; a replaced copy
+    # stays valid for processes that still have the old one mapped
+    target = os.path.join(directory, os.path.basename(path))
+    st = os.stat(path)
+    try:
+        current = os.stat(target)
+        if (current.st_size, current.st_mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return target
+    except OSError:
+        pass
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    shutil.copy2(path, tmp)
+    os.replace(tmp, target)
+    return target
+
+def load_dataset(name):
+    path = csv_path(name)
+    source = feather_path(name)
+    if shmDir and os.path.exists(source):
+        try:
+            source = shared_copy(source, shmDir)
+        except OSError as e:
+            print(f"Could not copy {name} to {shmDir}, mapping {source} instead: {e}")
+    df = read_feather(source, file_sha256(path))
+    if df is None:
+        df = pd.read_csv(path)
+        loaded[name] = {"format": "csv", "path": path, "mapped_bytes": 0}
+    else:
+        loaded[name] = {"format": "feather", "path": source, "mapped_bytes": os.path.getsize(source)}
+    return df
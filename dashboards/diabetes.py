@@ -1,10 +1,12 @@
 import dash
 from dash import Dash, html, dcc, Input, Output
 import plotly.express as px
-import pandas as pd
-import os
+import plotly.io as pio
+import numpy as np
+from dashboards.cube import RangeCube
+from dashboards.data import load_dataset
 
-df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "diabetes_prediction_dataset.csv"))
+df = load_dataset("diabetes")
 # إنشاء التطبيق
 # dash.register_page(__name__, path="/diabetes")
 
@@ -12,6 +14,15 @@ df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "diabe
 min_age = int(df['age'].min())
 max_age = int(df['age'].max())
 
+# the callbacks answer from this cube instead of filtering the 100k rows, and send pre-computed
+# boxes and pre-binned bars instead of every raw point
+box_variables = ['bmi', 'HbA1c_level', 'blood_glucose_level']
+cube = RangeCube(df, 'age', ['smoking_history', 'diabetes'], box_variables, box_group='diabetes')
+diabetes_values = cube.box_groups
+diabetes_colors = px.colors.qualitative.Plotly
+# figures are returned as plain dicts; building go.Figure objects would cost more than the lookups
+template = pio.templates['plotly_white'].to_plotly_json()
+
 # تصميم الواجهة (Layout)
 layout = html.Div([
     html.H1("📊 Diabetes Dashboard with Age Filter", style={'textAlign': 'center', 'marginBottom': 30}),
@@ -74,18 +85,30 @@ layout = html.Div([
      Input('age-slider', 'value')]
 )
 def update_box_plot(selected_var, age_range):
-    filtered_df = df[(df['age'] >= age_range[0]) & (df['age'] <= age_range[1])]
-    fig = px.box(
-        filtered_df,
-        x='diabetes',
-        y=selected_var,
-        color='diabetes',
-        title=f"Distribution of {selected_var.capitalize()} by Diabetes Status (Age {age_range[0]}–{age_range[1]})",
-        labels={'diabetes': 'Diabetes', selected_var: selected_var.capitalize()},
-        template='plotly_white'
-    )
-    fig.update_layout(title_x=0.5)
-    return fig
+    traces = []
+    for i, value in enumerate(diabetes_values):
+        stats = cube.box(selected_var, value, age_range[0], age_range[1])
+        if stats is None:
+            continue
+        traces.append({
+            'type': 'box',
+            'x': [int(value)],
+            'q1': [stats['q1']],
+            'median': [stats['median']],
+            'q3': [stats['q3']],
+            'lowerfence': [stats['lowerfence']],
+            'upperfence': [stats['upperfence']],
+            'name': str(value),
+            'marker': {'color': diabetes_colors[i % len(diabetes_colors)]},
+            'hovertext': f"n={stats['count']}, min={stats['min']}, max={stats['max']}"
+        })
+    return {'data': traces, 'layout': {
+        'title': {'text': f"Distribution of {selected_var.capitalize()} by Diabetes Status (Age {age_range[0]}–{age_range[1]})", 'x': 0.5},
+        'xaxis': {'title': {'text': 'Diabetes'}},
+        'yaxis': {'title': {'text': selected_var.capitalize()}},
+        'legend': {'title': {'text': 'Diabetes'}},
+        'template': template
+    }}
 
 
 # 🔹 Callback 2 → Histogram
@@ -95,18 +118,27 @@ def update_box_plot(selected_var, age_range):
      Input('age-slider', 'value')]
 )
 def update_chart(smoke_value, age_range):
-    filtered = df[(df['smoking_history'] == smoke_value) &
-                  (df['age'] >= age_range[0]) &
-                  (df['age'] <= age_range[1])]
+    # ages are counted into bins of a whole number of years, about 40 bins over the selected range
+    bin_size = max(1, int(np.ceil((age_range[1] - age_range[0] + 1) / 40)))
+    edges = np.arange(age_range[0], age_range[1] + bin_size + 1, bin_size)
 
-    fig = px.histogram(
-        filtered,
-        x='age',
-        color='diabetes',
-        barmode='group',
-        title=f"Diabetes by Age ({smoke_value}) - Age {age_range[0]}–{age_range[1]}",
-        labels={'age': 'Age', 'diabetes': 'Diabetes Status'},
-        template='plotly_white'
-    )
-    fig.update_layout(title_x=0.5)
-    return fig
+    traces = []
+    for i, value in enumerate(diabetes_values):
+        ages, counts = cube.counts((smoke_value, value), age_range[0], age_range[1])
+        binned = np.bincount(np.searchsorted(edges, ages, "right") - 1, weights=counts, minlength=len(edges) - 1)[:len(edges) - 1]
+        nonzero = binned > 0
+        traces.append({
+            'type': 'bar',
+            'x': (edges[:-1] + bin_size / 2)[nonzero].tolist(),
+            'y': binned[nonzero].astype(int).tolist(),
+            'name': str(value),
+            'marker': {'color': diabetes_colors[i % len(diabetes_colors)]}
+        })
+    return {'data': traces, 'layout': {
+        'title': {'text': f"Diabetes by Age ({smoke_value}) - Age {age_range[0]}–{age_range[1]}", 'x': 0.5},
+        'xaxis': {'title': {'text': 'Age'}},
+        'yaxis': {'title': {'text': 'count'}},
+        'legend': {'title': {'text': 'Diabetes Status'}},
+        'barmode': 'group',
+        'template': template
+    }}
@@ -1,26 +1,31 @@
 import dash
-import pandas as pd
 from dash import Dash, html, Input, Output, dcc
 import plotly.express as px
 import dash_bootstrap_components as dbc
-import os
+from dashboards.bitmap import BitmapIndex
+from dashboards.cache import dashboardCache
+from dashboards.data import load_dataset, csv_path
+from dashboards.scatter import scatter
 
-df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "heart_dashboard.csv"))
+df = load_dataset("heart")
+dashboardCache.register("heart", csv_path("heart"))
 numCols = ['Age', 'RestingBP', 'Cholesterol', 'MaxHR', 'Oldpeak']
 catCols = ['Sex', 'ChestPainType', 'FastingBS', 'RestingECG', 'ExerciseAngina', 'ST_Slope', 'HeartDisease']
+filterIndex = BitmapIndex(df, ['ChestPainType', 'RestingECG', 'ST_Slope', 'HeartDisease', 'Sex', 'FastingBS', 'ExerciseAngina'])
 
 # default figures
 PCOSPiePlot = px.pie(df, names="HeartDisease", title="Heart Disease")
 piePlot = px.pie(df, names="ChestPainType", title="Chest Pain Type")
 histogramPlot = px.histogram(df, x=numCols[0], title=numCols[0])
-scatterPlot = px.scatter(df, x=numCols[0], y=numCols[1], title=f"{numCols[0]} VS. {numCols[1]}")
-barPlot = px.bar(df.groupby(catCols[0], as_index=False)[numCols[0]].mean(), x=catCols[0], y=numCols[0], title=f"{catCols[0]} VS. Average {numCols[0]}")
+scatterPlot = scatter(df, x=numCols[0], y=numCols[1], title=f"{numCols[0]} VS. {numCols[1]}")
+barPlot = px.bar(df.groupby(catCols[0], as_index=False, observed=True)[numCols[0]].mean(), x=catCols[0], y=numCols[0], title=f"{catCols[0]} VS. Average {numCols[0]}")
 
 # dash.register_page(__name__, path="/heart", external_stylesheets=[dbc.themes.VAPOR])
 
 layout = dbc.Container(
     [
         html.H1("Heart Failure Dashboard"),
+        dcc.Store(id="heartFilters"),
         dbc.Row(
             [
                 dbc.Col(
@@ -337,14 +342,11 @@ layout = dbc.Container(
     ], className = 'pb-5'
 )
 
+# the filters only update the store; each figure has its own callback that depends on the store and
+# its own selectors, so changing one plot's axis rebuilds only that plot. The store holds the selection,
+# and filterIndex turns it back into rows (memoized per selection) on the server.
 @dash.callback(
-    [
-        Output('PCOSPiePlotGraph', 'figure'),
-        Output('piePlotGraph', 'figure'),
-        Output('histogramPlotGraph', 'figure'),
-        Output('scatterPlotGraph', 'figure'),
-        Output('barPlotGraph', 'figure')
-    ],
+    Output('heartFilters', 'data'),
     [
         Input('ChestPainType', 'value'),
         Input('RestingECG', 'value'),
@@ -352,59 +354,70 @@ layout = dbc.Container(
         Input('HeartDisease', 'value'),
         Input('Sex', 'value'),
         Input('FastingBS', 'value'),
-        Input('ExerciseAngina', 'value'),
-
-        Input('piePlot', 'value'),
-
-        Input('histPlot', 'value'),
-        Input('histPlotHue', 'value'),
-
-        Input('scatterPlotY', 'value'),
-        Input('scatterPlotX', 'value'),
-        Input('scatterPlotHue', 'value'),
-
-        Input('barPlotY', 'value'),
-        Input('barPlotX', 'value'),
-        Input('barPlotHue', 'value')
+        Input('ExerciseAngina', 'value')
     ]
 )
 def filtersEffect(
     ChestPainType,
-    RestingECG, 
-    ST_Slope, 
+    RestingECG,
+    ST_Slope,
     HeartDisease,
     Sex,
     FastingBS,
-    ExerciseAngina,
-    
-    piePlot,
+    ExerciseAngina
+):
+    return {
+        'ChestPainType': ChestPainType,
+        'RestingECG': RestingECG,
+        'ST_Slope': ST_Slope,
+        'HeartDisease': HeartDisease,
+        'Sex': Sex,
+        'FastingBS': FastingBS,
+        'ExerciseAngina': ExerciseAngina
+    }
 
-    histPlot,
-    histPlotHue,
+@dashboardCache.memoize("heart", shared=False)
+def filteredData(filters):
+    return filterIndex.filter(df, filters or {})
 
-    scatterPlotY,
-    scatterPlotX,
-    scatterPlotHue,
+@dash.callback(
+    Output('PCOSPiePlotGraph', 'figure'),
+    Input('heartFilters', 'data')
+)
+@dashboardCache.memoize("heart")
+def updatePCOSPiePlot(filters):
+    return px.pie(filteredData(filters), names="HeartDisease", title="Heart Disease")
 
-    barPlotY,
-    barPlotX,
-    barPlotHue,
-):
+@dash.callback(
+    Output('piePlotGraph', 'figure'),
+    [Input('heartFilters', 'data'), Input('piePlot', 'value')]
+)
+@dashboardCache.memoize("heart")
+def updatePiePlot(filters, piePlot):
+    return px.pie(filteredData(filters), names=piePlot, title=piePlot)
 
-    dff = df[
-        df['ChestPainType'].isin(ChestPainType) &
-        df['RestingECG'].isin(RestingECG) &
-        df['ST_Slope'].isin(ST_Slope) &
-        df['HeartDisease'].isin(HeartDisease) &
-        df['Sex'].isin(Sex) &
-        df['FastingBS'].isin(FastingBS) &
-        df['ExerciseAngina'].isin(ExerciseAngina)
-    ]
+@dash.callback(
+    Output('histogramPlotGraph', 'figure'),
+    [Input('heartFilters', 'data'), Input('histPlot', 'value'), Input('histPlotHue', 'value')]
+)
+@dashboardCache.memoize("heart")
+def updateHistogramPlot(filters, histPlot, histPlotHue):
+    return px.histogram(filteredData(filters), x=histPlot, title=histPlot, color=histPlotHue)
 
-    return [
-        px.pie(dff, names="HeartDisease", title="Heart Disease"),
-        px.pie(dff, names=piePlot, title=piePlot),
-        px.histogram(dff, x=histPlot, title=histPlot, color=histPlotHue),
-        px.scatter(dff, x=scatterPlotX, y=scatterPlotY, title=f"{scatterPlotY} VS. {scatterPlotX}", color=scatterPlotHue),
-        px.bar(dff.groupby(barPlotX, as_index=False)[barPlotY].mean(), x=barPlotX, y=barPlotY, title=f"{barPlotX} VS. Average {barPlotY}")
-    ]
+@dash.callback(
+    Output('scatterPlotGraph', 'figure'),
+    [Input('heartFilters', 'data'), Input('scatterPlotY', 'value'), Input('scatterPlotX', 'value'), Input('scatterPlotHue', 'value')]
+)
+@dashboardCache.memoize("heart")
+def updateScatterPlot(filters, scatterPlotY, scatterPlotX, scatterPlotHue):
+    return scatter(filteredData(filters), x=scatterPlotX, y=scatterPlotY, title=f"{scatterPlotY} VS. {scatterPlotX}", color=scatterPlotHue)
+
+# barPlotHue is not used by the bar plot, so it is not an input
+@dash.callback(
+    Output('barPlotGraph', 'figure'),
+    [Input('heartFilters', 'data'), Input('barPlotY', 'value'), Input('barPlotX', 'value')]
+)
+@dashboardCache.memoize("heart")
+def updateBarPlot(filters, barPlotY, barPlotX):
+    dff = filteredData(filters)
+    return px.bar(dff.groupby(barPlotX, as_index=False, observed=True)[barPlotY].mean(), x=barPlotX, y=barPlotY, title=f"{barPlotX} VS. Average {barPlotY}")
@@ -3,28 +3,44 @@ import os
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import Dash, dcc, html, Input, Output, callback
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, confusion_matrix
+import json
 import dash
 import dash_bootstrap_components as dbc
+from dashboards.cache import dashboardCache
+from dashboards.data import load_dataset, csv_path
+from dashboards.scatter import scatter
+from common.files import file_sha256
 
 
 
-df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "kidney.csv"))
+dataPath = csv_path("kidney")
+df = load_dataset("kidney")
+dashboardCache.register("kidney", dataPath)
 if df.duplicated().sum() > 0: df.drop_duplicates(inplace=True)
 for col in df.columns:
     if df[col].dtype != 'object': df[col] = df[col].fillna(df[col].median())
-X = df.drop('Class', axis=1)
-y = df['Class']
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-rf = RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42)
-rf.fit(X_train, y_train)
-acc = accuracy_score(y_test, rf.predict(X_test))
+
+# accuracy and feature importances come from kidney_dashboard.json, made by
+# `python -m tools.build_kidney_dashboard`; the model is only trained here if that file
+# is missing or was built from a different kidney.csv
+summaryPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kidney_dashboard.json")
+
+def load_summary():
+    try:
+        with open(summaryPath) as f:
+            summary = json.load(f)
+        if summary.get("version") == 1 and summary.get("data_sha256") == file_sha256(dataPath):
+            return summary
+        print("kidney_dashboard.json is out of date, training the dashboard model")
+    except (OSError, ValueError) as e:
+        print(f"Could not read kidney_dashboard.json ({e}), training the dashboard model")
+    from tools.build_kidney_dashboard import build
+    return build()
+
+summary = load_summary()
+acc = summary['accuracy']
 # حساب أهمية الميزات للرسم
-importances = rf.feature_importances_
-feat_df = pd.DataFrame({'Feature': X.columns, 'Importance': importances}).sort_values(by='Importance', ascending=False)
+feat_df = pd.DataFrame(summary['features'], columns=['Feature', 'Importance'])
 
 
 # ==========================================
@@ -107,9 +123,10 @@ layout = html.Div(style={'backgroundColor': colors['background'], 'color': 'whit
     [Input('xaxis-column', 'value'),
      Input('yaxis-column', 'value')]
 )
+@dashboardCache.memoize("kidney")
 def update_graph(xaxis_name, yaxis_name):
     # 1. Scatter Plot
-    fig1 = px.scatter(df, x=xaxis_name, y=yaxis_name, color='Class',
+    fig1 = scatter(df, x=xaxis_name, y=yaxis_name, color='Class',
                      color_discrete_map={0: '#00ccff', 1: '#ff3333'},
                      template='plotly_dark', title=f'{xaxis_name} vs {yaxis_name}')
     fig1.update_layout(transition_duration=500, paper_bgcolor=colors['panel'], plot_bgcolor=colors['panel'])
@@ -1,29 +1,31 @@
 import dash
-import pandas as pd
-import os
 from dash import html, Input, Output, dcc
 import plotly.express as px
 import dash_bootstrap_components as dbc
+from dashboards.bitmap import BitmapIndex
+from dashboards.cache import dashboardCache
+from dashboards.data import load_dataset, csv_path
+from dashboards.scatter import scatter
 
-# Load data - FIX the path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-# df = pd.read_csv(os.path.join(parent_dir, "pcos_dashboard.csv"))
-df = pd.read_csv("/home/maher/Desktop/depi-final-project/dashboards/pcos_dashboard.csv")
+# Load data
+df = load_dataset("pcos")
+dashboardCache.register("pcos", csv_path("pcos"))
 
 numCols = df.select_dtypes("number").columns
 catCols = df.select_dtypes(exclude=["number"]).columns
+filterIndex = BitmapIndex(df, ['PCOS (Y/N)', 'Blood Group', 'Pregnant(Y/N)', 'Weight gain(Y/N)', 'hair growth(Y/N)', 'Skin darkening (Y/N)', 'Hair loss(Y/N)', 'Pimples(Y/N)', 'Fast food (Y/N)', 'Reg.Exercise(Y/N)'])
 
 # default figures
 PCOSPiePlot = px.pie(df, names="PCOS (Y/N)", title="PCOS")
 piePlot = px.pie(df, names="Blood Group", title="Blood group")
 histogramPlot = px.histogram(df, x=numCols[0], title=numCols[0])
-scatterPlot = px.scatter(df, x=numCols[0], y=numCols[1], title=f"{numCols[0]} VS. {numCols[1]}")
-barPlot = px.bar(df.groupby(catCols[0], as_index=False)[numCols[0]].mean(), x=catCols[0], y=numCols[0], title=f"{catCols[0]} VS. Average {numCols[0]}")
+scatterPlot = scatter(df, x=numCols[0], y=numCols[1], title=f"{numCols[0]} VS. {numCols[1]}")
+barPlot = px.bar(df.groupby(catCols[0], as_index=False, observed=True)[numCols[0]].mean(), x=catCols[0], y=numCols[0], title=f"{catCols[0]} VS. Average {numCols[0]}")
 
 layout = dbc.Container(
     [
         html.H1("PCOS Dashboard"),
+        dcc.Store(id="pcos_filters"),
         dbc.Row(
             [
                 dbc.Col(
@@ -432,83 +434,91 @@ layout = dbc.Container(
 )
 
 # Update callback with new IDs
+# the filters only update the store; each figure has its own callback that depends on the store and
+# its own selectors, so changing one plot's axis rebuilds only that plot. The store holds the selection,
+# and filterIndex turns it back into rows (memoized per selection) on the server.
 @dash.callback(
+    Output('pcos_filters', 'data'),
     [
-        Output('pcos_PCOSPiePlotGraph', 'figure'),  # CHANGED
-        Output('pcos_piePlotGraph', 'figure'),  # CHANGED
-        Output('pcos_histogramPlotGraph', 'figure'),  # CHANGED
-        Output('pcos_scatterPlotGraph', 'figure'),  # CHANGED
-        Output('pcos_barPlotGraph', 'figure')  # CHANGED
-    ],
-    [
-        Input('pcos_bloodGroup', 'value'),  # CHANGED
-        Input('pcos_pcos', 'value'),  # CHANGED
-        Input('pcos_pregnant', 'value'),  # CHANGED
-        Input('pcos_weightGain', 'value'),  # CHANGED
-        Input('pcos_hairGrowth', 'value'),  # CHANGED
-        Input('pcos_skinDarkening', 'value'),  # CHANGED
-        Input('pcos_hairLoss', 'value'),  # CHANGED
-        Input('pcos_pimples', 'value'),  # CHANGED
-        Input('pcos_fastFood', 'value'),  # CHANGED
-        Input('pcos_regularExercise', 'value'),  # CHANGED
-
-        Input('pcos_piePlot', 'value'),  # CHANGED
-
-        Input('pcos_histPlot', 'value'),  # CHANGED
-        Input('pcos_histPlotHue', 'value'),  # CHANGED
-
-        Input('pcos_scatterPlotY', 'value'),  # CHANGED
-        Input('pcos_scatterPlotX', 'value'),  # CHANGED
-        Input('pcos_scatterPlotHue', 'value'),  # CHANGED
-
-        Input('pcos_barPlotY', 'value'),  # CHANGED
-        Input('pcos_barPlotX', 'value'),  # CHANGED
-        Input('pcos_barPlotHue', 'value')  # CHANGED
+        Input('pcos_pcos', 'value'),
+        Input('pcos_bloodGroup', 'value'),
+        Input('pcos_pregnant', 'value'),
+        Input('pcos_weightGain', 'value'),
+        Input('pcos_hairGrowth', 'value'),
+        Input('pcos_skinDarkening', 'value'),
+        Input('pcos_hairLoss', 'value'),
+        Input('pcos_pimples', 'value'),
+        Input('pcos_fastFood', 'value'),
+        Input('pcos_regularExercise', 'value')
     ]
 )
 def filtersEffect(
+    pcos,
     bloodGroup,
-    pcos, 
-    pregnant, 
+    pregnant,
     weightGain,
     hairGrowth,
     skinDarkening,
     hairLoss,
     pimples,
     fastFood,
-    regularExercise,
-    
-    piePlot,
+    regularExercise
+):
+    return {
+        'PCOS (Y/N)': pcos,
+        'Blood Group': bloodGroup,
+        'Pregnant(Y/N)': pregnant,
+        'Weight gain(Y/N)': weightGain,
+        'hair growth(Y/N)': hairGrowth,
+        'Skin darkening (Y/N)': skinDarkening,
+        'Hair loss(Y/N)': hairLoss,
+        'Pimples(Y/N)': pimples,
+        'Fast food (Y/N)': fastFood,
+        'Reg.Exercise(Y/N)': regularExercise
+    }
 
-    histPlot,
-    histPlotHue,
+@dashboardCache.memoize("pcos", shared=False)
+def filteredData(filters):
+    return filterIndex.filter(df, filters or {})
 
-    scatterPlotY,
-    scatterPlotX,
-    scatterPlotHue,
+@dash.callback(
+    Output('pcos_PCOSPiePlotGraph', 'figure'),
+    Input('pcos_filters', 'data')
+)
+@dashboardCache.memoize("pcos")
+def updatePCOSPiePlot(filters):
+    return px.pie(filteredData(filters), names="PCOS (Y/N)", title="PCOS")
 
-    barPlotY,
-    barPlotX,
-    barPlotHue,
-):
+@dash.callback(
+    Output('pcos_piePlotGraph', 'figure'),
+    [Input('pcos_filters', 'data'), Input('pcos_piePlot', 'value')]
+)
+@dashboardCache.memoize("pcos")
+def updatePiePlot(filters, piePlot):
+    return px.pie(filteredData(filters), names=piePlot, title=piePlot)
 
-    dff = df[
-        df['PCOS (Y/N)'].isin(pcos) &
-        df['Blood Group'].isin(bloodGroup) &
-        df['Pregnant(Y/N)'].isin(pregnant) &
-        df['Weight gain(Y/N)'].isin(weightGain) &
-        df['hair growth(Y/N)'].isin(hairGrowth) &
-        df['Skin darkening (Y/N)'].isin(skinDarkening) &
-        df['Hair loss(Y/N)'].isin(hairLoss) &
-        df['Pimples(Y/N)'].isin(pimples) &
-        df['Fast food (Y/N)'].isin(fastFood)&
-        df['Reg.Exercise(Y/N)'].isin(regularExercise)
-    ]
+@dash.callback(
+    Output('pcos_histogramPlotGraph', 'figure'),
+    [Input('pcos_filters', 'data'), Input('pcos_histPlot', 'value'), Input('pcos_histPlotHue', 'value')]
+)
+@dashboardCache.memoize("pcos")
+def updateHistogramPlot(filters, histPlot, histPlotHue):
+    return px.histogram(filteredData(filters), x=histPlot, title=histPlot, color=histPlotHue)
 
-    return [
-        px.pie(dff, names="PCOS (Y/N)", title="PCOS"),
-        px.pie(dff, names=piePlot, title=piePlot),
-        px.histogram(dff, x=histPlot, title=histPlot, color=histPlotHue),
-        px.scatter(dff, x=scatterPlotX, y=scatterPlotY, title=f"{scatterPlotY} VS. {scatterPlotX}", color=scatterPlotHue),
-        px.bar(dff.groupby(barPlotX, as_index=False)[barPlotY].mean(), x=barPlotX, y=barPlotY, title=f"{barPlotX} VS. Average {barPlotY}")
-    ]
\ No newline at end of file
+@dash.callback(
+    Output('pcos_scatterPlotGraph', 'figure'),
+    [Input('pcos_filters', 'data'), Input('pcos_scatterPlotY', 'value'), Input('pcos_scatterPlotX', 'value'), Input('pcos_scatterPlotHue', 'value')]
+)
+@dashboardCache.memoize("pcos")
+def updateScatterPlot(filters, scatterPlotY, scatterPlotX, scatterPlotHue):
+    return scatter(filteredData(filters), x=scatterPlotX, y=scatterPlotY, title=f"{scatterPlotY} VS. {scatterPlotX}", color=scatterPlotHue)
+
+# barPlotHue is not used by the bar plot, so it is not an input
+@dash.callback(
+    Output('pcos_barPlotGraph', 'figure'),
+    [Input('pcos_filters', 'data'), Input('pcos_barPlotY', 'value'), Input('pcos_barPlotX', 'value')]
+)
+@dashboardCache.memoize("pcos")
+def updateBarPlot(filters, barPlotY, barPlotX):
+    dff = filteredData(filters)
+    return px.bar(dff.groupby(barPlotX, as_index=False, observed=True)[barPlotY].mean(), x=barPlotX, y=barPlotY, title=f"{barPlotX} VS. Average {barPlotY}")
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Scatter plots switch to WebGL above DASHBOARD_SCATTER_WEBGL_POINTS points. Above
+# DASHBOARD_SCATTER_MAX_POINTS the server reduces the points first: "sample" keeps every occupied
+# region of the plot and thins dense regions in proportion to their density, "heatmap" sends binned
+# counts instead of points.
+webglPoints = int(os.environ.get("DASHBOARD_SCATTER_WEBGL_POINTS", 1000))
+maxPoints = int(os.environ.get("DASHBOARD_SCATTER_MAX_POINTS", 20000))
+overflowMode = os.environ.get("DASHBOARD_SCATTER_OVERFLOW", "sample")
+GRID_SIZE = 64
+
+def _grid_codes(values, bins):
+    # bin index of every value; categories and missing values get their own bins
+    if not pd.api.types.is_numeric_dtype(values):
+        codes, _ = pd.factorize(values, use_na_sentinel=False)
+        return codes
+    values = values.to_numpy(dtype=float)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.zeros(len(values), dtype=np.int64)
+    lo, hi = values[finite].min(), values[finite].max()
+    span = hi - lo or 1.0
+    codes = np.full(len(values), bins, dtype=np.int64)
+    codes[finite] = np.minimum(((values[finite] - lo) / span * bins).astype(np.int64), bins - 1)
+    return codes
+
+def downsample(df, x, y, budget, color=None, seed=0):
+    # keeps at least one point of every occupied grid cell (per color), so outliers and sparse regions
+    # stay visible, and fills the rest of the budget proportionally to each cell's count
+    if len(df) <= budget:
+        return df
+    cells = np.zeros(len(df), dtype=np.int64)
+    for codes in [_grid_codes(df[x], GRID_SIZE), _grid_codes(df[y], GRID_SIZE)] + (
+        [pd.factorize(df[color], use_na_sentinel=False)[0]] if color is not None else []
+    ):
+        cells = cells * (int(codes.max()) + 1) + codes
+    _, cells, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(df))
+    # rank of each row inside its cell, in random order
+    order = order[np.argsort(cells[order], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df)) - np.repeat(starts, counts)
+
+    if len(counts) >= budget:
+        quota = np.zeros(len(counts), dtype=np.int64)
+        quota[rng.choice(len(counts), budget, replace=False)] = 1
+    else:
+        ratio = (budget - len(counts)) / (len(df) - len(counts))
+        quota = 1 + np.floor((counts - 1) * ratio).astype(np.int64)
+    keep = np.sort(np.flatnonzero(rank < quota[cells]))
+    return df.take(keep)
+
+def binned_heatmap(df, x, y, title=None, template=None, bins=100):
+    # 2D histogram computed on the server; only the count matrix is sent to the browser
+    data = df[[x, y]].apply(pd.to_numeric, errors="coerce").dropna()
+    counts, xedges, yedges = np.histogram2d(data[x], data[y], bins=bins)
+    fig = go.Figure(go.Heatmap(
+        x=(xedges[:-1] + xedges[1:]) / 2,
+        y=(yedges[:-1] + yedges[1:]) / 2,
+        z=np.where(counts.T > 0, counts.T, np.nan),
+        colorscale="Viridis",
+        colorbar={"title": {"text": "count"}}
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    if template is not None:
+        fig.update_layout(template=template)
+    return fig
+
+def scatter(df, x, y, color=None, title=None, **kwargs):
+    # px.scatter with WebGL above the point threshold and server-side reduction above the budget
+    total = len(df)
+    if maxPoints and total > maxPoints:
+        if overflowMode == "heatmap" and x != y:
+            return binned_heatmap(df, x, y, title=f"{title or ''} ({total} points, binned)", template=kwargs.get("template"))
+        df = downsample(df, x, y, maxPoints, color)
+        title = f"{title or ''} ({len(df)} of {total} points)"
+    render_mode = "webgl" if len(df) > webglPoints else "svg"
+    return px.scatter(df, x=x, y=y, color=color, title=title, render_mode=render_mode, **kwargs)
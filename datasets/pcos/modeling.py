@@ -1,161 +1,200 @@
-import pandas as pd
+# Model selection for the PCOS pipeline. Every candidate (MinMaxScaler + estimator) is scored with
+# stratified k-fold cross-validation, with all (candidate, fold) fits spread over the cores. The one with
+# the best mean --metric is refit on the whole dataset and written, with its feature list and the
+# metrics of every candidate, to a new versioned directory under --output:
+#
+#   artifacts/<version>/pcos_pipeline.pkl     the fitted Pipeline
+#   artifacts/<version>/model_features.pkl    its feature names, in order
+#   artifacts/<version>/metrics.json          cross-validation scores and the settings used
+#   artifacts/LATEST                          name of the newest version, which rag.py loads
+#
+# The cleaned feature matrix is cached under --cache, keyed by a hash of the CSV, so later runs skip
+# the preprocessing.
+#
+#   python datasets/pcos/modeling.py --metric recall --folds 5 --jobs -1
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+import warnings
+
+import joblib
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler,MinMaxScaler,robust_scale
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
 from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier,AdaBoostClassifier
-from xgboost import XGBClassifier
-from lightgbm import LGBMClassifier
-from sklearn.svm import SVC
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import accuracy_score, classification_report
-import warnings
-from sklearn.exceptions import ConvergenceWarning
-import joblib
-
-# --- Main Try-Except Block ---
-try:
-
-    # Use a specific try-except for file reading
-    try:
-        # Read the CSV file
-        # df = pd.read_excel('./PCOS_data_without_infertility.xlsx',sheet_name='Full_new')
-        df = pd.read_csv('./datasets/pcos/pcos_model.csv')
-    except FileNotFoundError:
-        print(f"--- File not found:  ---")
-        print("--- Please ensure the file is in the correct path. ---")
-        raise # Stop execution
-    except pd.errors.EmptyDataError:
-        print(f"--- The file  is empty. ---")
-        raise # Stop execution
-
-    print("\n--- Data loaded successfully ---")
+from sklearn.preprocessing import MinMaxScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
 
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(HERE)))
 
+from common.files import file_sha256
 
-    # --- 2. Data Preprocessing ---
-    print("--- 2. Processing data... ---")
+TARGET_COLUMN = 'PCOS (Y/N)_yes'
+DROP_COLUMNS = ['Sl. No', 'Patient File No.', 'Unnamed: 44']
+NUMERIC_COLUMNS = ['II    beta-HCG(mIU/mL)', 'AMH(ng/mL)']
+# bumped whenever preprocess() changes, so older cached matrices are not reused
+PREPROCESSING_VERSION = 1
 
+METRICS = ['accuracy', 'precision', 'recall', 'f1', 'roc_auc']
 
+# one estimator per fit; the parallelism is across fits
+CANDIDATES = {
+    'Logistic Regression': lambda seed: LogisticRegression(max_iter=1000, random_state=seed),
+    'Decision Tree': lambda seed: DecisionTreeClassifier(random_state=seed),
+    'Random Forest': lambda seed: RandomForestClassifier(random_state=seed, n_jobs=1),
+    'SVM': lambda seed: SVC(random_state=seed),
+    'KNN': lambda seed: KNeighborsClassifier(n_jobs=1),
+    'Gradient Boosting': lambda seed: GradientBoostingClassifier(random_state=seed),
+    'AdaBoost': lambda seed: AdaBoostClassifier(random_state=seed),
+    'XGBoost': lambda seed: XGBClassifier(random_state=seed, eval_metric='logloss', n_jobs=1),
+}
 
-    # Clean column names (remove leading/trailing spaces)
+def preprocess(df):
     df.columns = df.columns.str.strip()
-
-    # Define columns to drop
-    cols_to_drop = ['Sl. No', 'Patient File No.', 'Unnamed: 44']
-
-    # Ensure columns exist before dropping them
-    cols_to_drop_existing = [col for col in cols_to_drop if col in df.columns]
-    df = df.drop(columns=cols_to_drop_existing)
-
-    # Convert object columns to numeric
-    # (Corrected column name based on data info)
-    obj_cols = ['II    beta-HCG(mIU/mL)', 'AMH(ng/mL)']
-    for col in obj_cols:
+    df = df.drop(columns=[col for col in DROP_COLUMNS if col in df.columns])
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    # Fill missing values (NaN) with the column median
-    for col in df.columns:
-        if df[col].isnull().any():
-            median_val = df[col].median()
-            df[col] = df[col].fillna(median_val)
-
-
-
-    print("--- Data processing complete. ---")
-
-
-
-    # --- 3. Define Features (X) and Target (y) ---
-    target_column = 'PCOS (Y/N)_yes'
-    if target_column not in df.columns:
-        print(f"--- Target column '{target_column}' not found in the file! ---")
-    else:
-        y = df[target_column]
-        X = df.drop(columns=target_column)
-
-        # --- 4. Split Data ---
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-        print("--- 4. Data split into training and testing sets. ---")
-
-        # --- 5. Define and Train Models ---
-        print("--- 5. Starting model training and evaluation... ---\n")
-        scaler = MinMaxScaler()
-
-        models = {
-            'Logistic Regression': LogisticRegression(max_iter=1000, random_state=42),
-            'Decision Tree': DecisionTreeClassifier(random_state=42,),
-            'Random Forest': RandomForestClassifier(random_state=42),
-            'SVM': SVC(random_state=42),
-            'KNN': KNeighborsClassifier(),
-            'Gradient Boosting': GradientBoostingClassifier(random_state=42),
-            'AdaBoost': AdaBoostClassifier(random_state=42),
-            'XGBoost': XGBClassifier(random_state=42, use_label_encoder=False,  eval_metric='logloss'),
-
-        }
-
-        results = {}
-
-        # Suppress convergence warnings during training
+    # missing values take the column median
+    df = df.fillna(df.median(numeric_only=True))
+    if TARGET_COLUMN not in df.columns:
+        raise KeyError(TARGET_COLUMN)
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int64)
+    X = df.drop(columns=TARGET_COLUMN)
+    return X.to_numpy(dtype=np.float64), y, list(X.columns)
+
+def load_matrix(data_path, cache_dir):
+    # (X, y, feature names, data hash, whether the cache was used)
+    data_hash = file_sha256(data_path)
+    cache_path = os.path.join(cache_dir, f"pcos-{data_hash[:16]}-v{PREPROCESSING_VERSION}.npz") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with np.load(cache_path, allow_pickle=False) as cached:
+            return cached['X'], cached['y'], cached['columns'].tolist(), data_hash, True
+    X, y, columns = preprocess(pd.read_csv(data_path))
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, X=X, y=y, columns=np.array(columns))
+        os.replace(tmp, cache_path)
+    return X, y, columns, data_hash, False
+
+def make_pipeline(name, seed):
+    return Pipeline([
+        ('scaler', MinMaxScaler()),
+        ('model', CANDIDATES[name](seed))
+    ])
+
+def fit_fold(name, seed, X, y, train, test, metrics):
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    warnings.filterwarnings("ignore", category=UserWarning)
+    pipeline = make_pipeline(name, seed)
+    start = time.perf_counter()
+    pipeline.fit(X[train], y[train])
+    seconds = time.perf_counter() - start
+    return name, {metric: float(get_scorer(metric)(pipeline, X[test], y[test])) for metric in metrics}, seconds
+
+def cross_validate_candidates(names, X, y, folds, seed, metrics, jobs):
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X, y))
+    fits = Parallel(n_jobs=jobs)(
+        delayed(fit_fold)(name, seed, X, y, train, test, metrics) for name in names for train, test in splits
+    )
+    results = {name: {'folds': [], 'fit_seconds': 0.0} for name in names}
+    for name, scores, seconds in fits:
+        results[name]['folds'].append(scores)
+        results[name]['fit_seconds'] += seconds
+    for result in results.values():
+        for metric in metrics:
+            values = [scores[metric] for scores in result['folds']]
+            result[metric] = {'mean': float(np.mean(values)), 'std': float(np.std(values))}
+    return results
+
+def new_version(output):
+    version = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d-%H%M%S')
+    path, n = os.path.join(output, version), 1
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(output, f"{version}-{n}")
+    os.makedirs(path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(HERE, "pcos_model.csv"))
+    parser.add_argument("--output", default=os.path.join(HERE, "artifacts"))
+    parser.add_argument("--cache", default=os.path.join(HERE, "artifacts", "cache"), help="'' disables the matrix cache")
+    parser.add_argument("--metric", default="recall", help="any scikit-learn scorer name, e.g. recall, f1, roc_auc")
+    parser.add_argument("--models", default=",".join(CANDIDATES), help="comma-separated candidates")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.models.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CANDIDATES]
+    if unknown:
+        parser.error(f"unknown models {unknown}; choose from {list(CANDIDATES)}")
+    try:
+        get_scorer(args.metric)
+    except ValueError as e:
+        parser.error(str(e))
+    metrics = list(dict.fromkeys(METRICS + [args.metric]))
+
+    start = time.perf_counter()
+    X, y, columns, data_hash, cached = load_matrix(args.data, args.cache)
+    print(f"--- {X.shape[0]} rows, {X.shape[1]} features ({'cached matrix' if cached else 'preprocessed'}, "
+          f"{time.perf_counter() - start:.2f}s) ---")
+
+    start = time.perf_counter()
+    results = cross_validate_candidates(names, X, y, args.folds, args.seed, metrics, args.jobs)
+    cv_seconds = time.perf_counter() - start
+    print(f"--- {len(names)} models x {args.folds} folds in {cv_seconds:.1f}s ---\n")
+    print(f"{'model':<20} " + " ".join(f"{metric:>15}" for metric in metrics))
+    for name, result in results.items():
+        print(f"{name:<20} " + " ".join(f"{result[m]['mean']:8.3f} ±{result[m]['std']:5.3f}" for m in metrics))
+
+    # best mean score, then the steadier model
+    best = max(names, key=lambda name: (results[name][args.metric]['mean'], -results[name][args.metric]['std']))
+    pipeline = make_pipeline(best, args.seed)
+    with warnings.catch_warnings():
         warnings.filterwarnings("ignore", category=ConvergenceWarning)
-        warnings.filterwarnings("ignore", category=UserWarning)
-
-        for name, model in models.items():
-            try:
-                # Create a pipeline with scaling and the model
-                pipeline = Pipeline([
-                    ('scaler', scaler),
-                    ('model', model)
-                ])
-
-                # Train the pipeline
-                pipeline.fit(X_train, y_train)
-
-                # Predict on the test set
-                y_pred = pipeline.predict(X_test)
-
-                # Calculate accuracy
-                accuracy = accuracy_score(y_test, y_pred)*100
-                results[name] = {'accuracy': accuracy, 'model': pipeline}
-
-                print(f"Model: {name}")
-                print(f"Accuracy: {accuracy:.2f}%\n")
-                report = classification_report(y_test, y_pred, target_names=['No PCOS (0)', 'PCOS (1)'])
-                print(f"\n Detailed {name} Report :")
-                print(report)
-                print("-"*50)
-
-            except Exception as model_error:
-                print(f"--- Error training model {name}: {model_error} ---")
-        
-        print('Select model to save by number')
-        model_names = list(results.keys())
-        for i, model in enumerate(results.keys()):
-            print(f"{i}. {model}")
-
-        joblib.dump(results[model_names[int(input("Enter model number: "))]]['model'], 'pcos.pkl')
-
-    print("--- standerscaler out --->91.7%,but recall=89% ---")
-
-
-
-# --- General Exception Handling ---
-except KeyError as e:
-    print(f"--- FATAL ERROR: A required column is missing from the file: {e} ---")
-    print("--- Please review the column names in your file. ---")
-
-except ValueError as e:
-    print(f"---  A data value error occurred (ValueError): {e} ---")
-    print("--- This might be due to non-numeric data that could not be converted. ---")
-
-except Exception as e:
-    # Catch any other unexpected error
-    print(f"--- An unexpected general error occurred: {e} ---")
-
-print("\n--- Code execution finished. ---")
-
-
-
+        pipeline.fit(pd.DataFrame(X, columns=columns), y)
+
+    path = new_version(args.output)
+    joblib.dump(pipeline, os.path.join(path, "pcos_pipeline.pkl"))
+    joblib.dump(columns, os.path.join(path, "model_features.pkl"))
+    with open(os.path.join(path, "metrics.json"), "w") as f:
+        json.dump({
+            "selected": best,
+            "metric": args.metric,
+            "folds": args.folds,
+            "seed": args.seed,
+            "rows": int(X.shape[0]),
+            "features": columns,
+            "data": os.path.abspath(args.data),
+            "data_sha256": data_hash,
+            "versions": {"scikit-learn": sklearn.__version__, "joblib": joblib.__version__},
+            "cv_seconds": cv_seconds,
+            "candidates": results,
+        }, f, indent=2)
+    # replaced in one step, so the assistant never reads a half-written name
+    latest = os.path.join(args.output, "LATEST")
+    with open(f"{latest}.{os.getpid()}.tmp", "w") as f:
+        f.write(os.path.basename(path) + "\n")
+    os.replace(f"{latest}.{os.getpid()}.tmp", latest)
+    print(f"\n--- selected {best}: {args.metric} {results[best][args.metric]['mean']:.3f}, written to {path} ---")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,30 @@
 import joblib
+import numpy as np
 import pandas as pd
+import bisect
+import csv
+import difflib
+import functools
+import heapq
+import itertools
 import json
 import datetime
+import os
 import re
 import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# the repository root, for the helpers shared with the app (this file also runs as a script from here)
+ROOT = os.path.dirname(os.path.dirname(HERE))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from common.files import file_sha256
 
 clinic_database = [
     {"id": 1, "name": "Lotus Women's Care", "location": "Downtown Cairo", "specialty": "PCOS & Hormones", "doctors": ["Dr. Sarah Ahmed"], "rating": 4.9},
@@ -24,22 +45,199 @@ medical_advice_db = {
     "general": "PCOS is manageable with lifestyle changes. Regular exercise and a balanced diet are your first line of defense."
 }
 
+# columns of a clinic/lab CSV or SQLite table that hold several values ("Dr. A; Dr. B") or numbers
+LIST_COLUMNS = ('doctors', 'tests')
+NUMBER_COLUMNS = {'id': int, 'rating': float}
+
+def load_directory(source, table, default):
+    # clinics or labs from a CSV file or a table of an SQLite database; `default` when no source is set
+    if not source:
+        return default
+    if source.lower().endswith('.csv'):
+        with open(source, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        connection = sqlite3.connect(source)
+        try:
+            connection.row_factory = sqlite3.Row
+            rows = [dict(row) for row in connection.execute(f'SELECT * FROM "{table}"')]
+        finally:
+            connection.close()
+    for row in rows:
+        for column in LIST_COLUMNS:
+            if isinstance(row.get(column), str):
+                row[column] = [value.strip() for value in row[column].split(';') if value.strip()]
+        for column, convert in NUMBER_COLUMNS.items():
+            if row.get(column) not in (None, ''):
+                row[column] = convert(row[column])
+    return rows
+
+def search_tokens(text):
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+class DirectoryIndex:
+    # Inverted index over some text fields of the clinic or lab directory (token -> positions of the
+    # records that contain it). A query token that is not in the index matches the tokens it is a prefix
+    # of, and failing that the closest tokens by spelling. Results are ranked by how many query tokens
+    # they match, then by rating.
+
+    def __init__(self, records, fields, min_prefix=3, fuzzy_cutoff=0.8):
+        self.records = list(records)
+        self.fields = fields
+        self.min_prefix = min_prefix
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.postings = {}
+        for position, record in enumerate(self.records):
+            for field in fields:
+                values = record.get(field) or ''
+                for value in (values if isinstance(values, list) else [values]):
+                    for token in search_tokens(str(value)):
+                        self.postings.setdefault(token, set()).add(position)
+        self.by_rating = sorted(range(len(self.records)), key=lambda i: -(self.records[i].get('rating') or 0))
+        # place of every record in the rating order, ties in directory order
+        self.rank = [0] * len(self.records)
+        for place, position in enumerate(self.by_rating):
+            self.rank[position] = place
+        # postings in rating order, so the best records for one term are its first ones
+        self.postings = {token: sorted(positions, key=self.rank.__getitem__) for token, positions in self.postings.items()}
+        self.vocabulary = sorted(self.postings)
+        self.expand = functools.lru_cache(maxsize=4096)(self._expand)
+
+    def _expand(self, token):
+        # the indexed tokens a query token stands for
+        if token in self.postings:
+            return (token,)
+        if len(token) < self.min_prefix:
+            return ()
+        start = bisect.bisect_left(self.vocabulary, token)
+        prefixed = tuple(itertools.takewhile(lambda term: term.startswith(token), itertools.islice(self.vocabulary, start, None)))
+        if prefixed:
+            return prefixed
+        return tuple(difflib.get_close_matches(token, self.vocabulary, n=3, cutoff=self.fuzzy_cutoff))
+
+    def search(self, query, limit=None, ignore=()):
+        expanded = [self.expand(token) for token in dict.fromkeys(search_tokens(query)) if token not in ignore]
+        expanded = [terms for terms in expanded if terms]
+        if len(expanded) == 1 and len(expanded[0]) == 1:
+            ranked = self.postings[expanded[0][0]][:limit]
+        else:
+            scores = Counter()
+            for terms in expanded:
+                scores.update(set(itertools.chain.from_iterable(self.postings[term] for term in terms)))
+            size, rank = len(self.records), self.rank
+            keys = {i: rank[i] - score * size for i, score in scores.items()}
+            ranked = heapq.nsmallest(limit or len(keys), keys, key=keys.__getitem__)
+        return [self.records[i] for i in ranked]
+
+    def top(self, limit):
+        return [self.records[i] for i in self.by_rating[:limit]]
+
+    def __len__(self):
+        return len(self.records)
+
+class LoadedPipeline:
+    def __init__(self, pipeline, feature_names):
+        self.pipeline = pipeline
+        self.columns = pd.Index(feature_names)
+        self.index = {name: i for i, name in enumerate(feature_names)}
+        self.template = np.zeros((1, len(feature_names)))
+
+    def frame(self, inputs):
+        # one model row: known features filled in, every other column 0
+        row = self.template.copy()
+        for key, value in inputs.items():
+            i = self.index.get(key)
+            if i is not None:
+                row[0, i] = value
+        return pd.DataFrame(row, columns=self.columns)
+
+class ModelHandle:
+    # Loads the pipeline and its feature list once per process. Every call stats both files; only when
+    # their mtime or size moved is the content hashed, and only a changed hash reloads them. With
+    # `latest` (the artifacts/LATEST file modeling.py writes), the files of the version it names are
+    # used instead, and a new training run is picked up on the next call.
+    def __init__(self, pipeline_path, features_path, latest=None):
+        self.default_paths = (pipeline_path, features_path)
+        self.paths = self.default_paths
+        self.latest = latest
+        self.latest_stat = None
+        self.lock = threading.Lock()
+        self.stats = None
+        self.hashes = None
+        self.loaded = None
+        self.loads = 0
+
+    def stat_latest(self):
+        if not self.latest:
+            return None
+        try:
+            st = os.stat(self.latest)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def resolve(self):
+        # called under self.lock, so the paths change together with what is loaded from them
+        latest_stat = self.stat_latest()
+        if latest_stat is None:
+            self.paths = self.default_paths
+        elif latest_stat != self.latest_stat:
+            with open(self.latest) as f:
+                directory = os.path.join(os.path.dirname(self.latest), f.read().strip())
+            self.paths = tuple(os.path.join(directory, os.path.basename(path)) for path in self.default_paths)
+        self.latest_stat = latest_stat
+
+    def get(self):
+        if self.stat_latest() == self.latest_stat and self.stats is not None:
+            stats = tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, self.paths))
+            if stats == self.stats:
+                return self.loaded
+        with self.lock:
+            self.resolve()
+            stats = tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, self.paths))
+            if stats != self.stats:
+                hashes = tuple(file_sha256(path) for path in self.paths)
+                if hashes != self.hashes:
+                    self.loaded = LoadedPipeline(joblib.load(self.paths[0]), list(joblib.load(self.paths[1])))
+                    self.hashes = hashes
+                    self.loads += 1
+                self.stats = stats
+        return self.loaded
+
+# next to this file, not in the working directory, so the app serving the assistant finds them too;
+# unless PCOS_PIPELINE is set, the newest training run of modeling.py (artifacts/LATEST) comes first
+pcos_model = ModelHandle(os.environ.get('PCOS_PIPELINE', os.path.join(HERE, 'pcos_pipeline.pkl')),
+                         os.environ.get('PCOS_FEATURES', os.path.join(HERE, 'model_features.pkl')),
+                         latest=None if 'PCOS_PIPELINE' in os.environ else os.path.join(HERE, 'artifacts', 'LATEST'))
+
+# profile fields as the model names them, and the attribute each one is kept in
+PROFILE_FIELDS = {
+    'Age': 'age',
+    'AMH(ng/mL)': 'amh',
+    'Cycle(R/I)': 'cycle',
+    'Follicle No. (L)': 'follicles_left',
+    'Follicle No. (R)': 'follicles_right',
+    'Weight gain(Y/N)': 'weight_gain'
+}
+
 class SessionMemory:
+    # slots instead of a per-session dict, so tens of thousands of open sessions stay small
+    __slots__ = tuple(PROFILE_FIELDS.values()) + ('lock',)
+
     def __init__(self):
-        self.user_profile = {
-            'Age': None,
-            'AMH(ng/mL)': None,
-            'Cycle(R/I)': None,
-            'Follicle No. (L)': None,
-            'Follicle No. (R)': None,
-            'Weight gain(Y/N)': None
-        }
-        self.history = []
+        for attr in PROFILE_FIELDS.values():
+            setattr(self, attr, None)
+        # held by SessionStore.turn(), one turn of a session at a time
+        self.lock = threading.Lock()
+
+    @property
+    def user_profile(self):
+        return {key: getattr(self, attr) for key, attr in PROFILE_FIELDS.items()}
 
     def update(self, new_data):
         for key, value in new_data.items():
-            if value is not None:
-                self.user_profile[key] = value
+            if value is not None and key in PROFILE_FIELDS:
+                setattr(self, PROFILE_FIELDS[key], value)
 
     def get_profile_json(self):
         temp_profile = self.user_profile.copy()
@@ -50,46 +248,214 @@ class SessionMemory:
         return json.dumps(temp_profile)
 
     def is_data_sufficient(self):
-        return self.user_profile['AMH(ng/mL)'] is not None or self.user_profile['Cycle(R/I)'] is not None
-
-def extract_medical_data_smart(text):
-    text = text.lower()
-    data = {}
-
-    amh_match = re.search(r'amh\s*(?:is|:)?\s*(\d+(\.\d+)?)', text)
-    if amh_match:
-        val = float(amh_match.group(1))
-        if 0 < val < 50:
-            data['AMH(ng/mL)'] = val
-
-    if 'irregular' in text: data['Cycle(R/I)'] = 4
-    elif 'regular' in text: data['Cycle(R/I)'] = 2
+        return self.amh is not None or self.cycle is not None
+
+class SessionStore:
+    # Profiles of concurrent users by session id. At most `maxsize` stay in memory; the least recently
+    # used is evicted first and a session idle for `ttl` seconds is dropped. With `db_path` every update
+    # is also written to SQLite, so evicted sessions and restarts keep their profile until the TTL.
+    def __init__(self, maxsize=10000, ttl=1800, db_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.db_path = db_path
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if db_path:
+            # closed again at once; the store is created at import, under gunicorn in the master
+            conn = sqlite3.connect(db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, profile TEXT, updated REAL)")
+            conn.commit()
+            conn.close()
+
+    def _connection(self):
+        # one per thread and per process: a connection must not be used across fork
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = self.local.conn = sqlite3.connect(self.db_path, timeout=5)
+            self.local.pid = os.getpid()
+        return conn
+
+    def _load(self, session_id, now):
+        row = self._connection().execute("SELECT profile, updated FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or (self.ttl and row[1] < now - self.ttl):
+            return None
+        memory = SessionMemory()
+        memory.update(json.loads(row[0]))
+        return memory
+
+    def get(self, session_id):
+        # the session's memory, restored from SQLite or started empty if it is not in memory
+        now = time.monotonic()
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is not None and self.ttl and entry[1] < now - self.ttl:
+                del self.sessions[session_id]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self.sessions.move_to_end(session_id)
+                self.sessions[session_id] = (entry[0], now)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        memory = self._load(session_id, time.time()) if self.db_path else None
+        if memory is None:
+            memory = SessionMemory()
+        with self.lock:
+            # another request of the same session may have created it meanwhile
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                return entry[0]
+            self.sessions[session_id] = (memory, now)
+            while len(self.sessions) > self.maxsize:
+                self.sessions.popitem(last=False)
+                self.evictions += 1
+        return memory
+
+    def turn(self, session_id, respond):
+        # runs respond(memory) -> (reply, updated) under the session's lock and writes the profile back
+        # if it changed, so concurrent requests of one session do not race on it; returns
+        # (reply, updated, profile)
+        memory = self.get(session_id)
+        with memory.lock:
+            reply, updated = respond(memory)
+            if updated:
+                self.save(session_id, memory)
+            return reply, updated, memory.user_profile
+
+    def save(self, session_id, memory):
+        if not self.db_path:
+            return
+        conn = self._connection()
+        now = time.time()
+        profile = {k: v for k, v in memory.user_profile.items() if v is not None}
+        conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (session_id, json.dumps(profile), now))
+        self.writes += 1
+        if self.ttl and self.writes % 100 == 0:
+            conn.execute("DELETE FROM sessions WHERE updated < ?", (now - self.ttl,))
+        conn.commit()
+
+    def discard(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+        if self.db_path:
+            conn = self._connection()
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            conn.commit()
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "persistent": bool(self.db_path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
 
-    age_match = re.search(r'(\d+)\s*(?:years old|yrs|age)', text)
-    if age_match:
-        val = int(age_match.group(1))
-        if 10 < val < 60:
-            data['Age'] = val
+def value_reader(pattern, convert, valid):
+    # reads the first match of `pattern` (its first group), if the converted value passes `valid`
+    regex = re.compile(pattern)
+
+    def read(text, found):
+        match = regex.search(text)
+        if match:
+            value = convert(match.group(1))
+            if valid(value):
+                return value
+        return None
+    return read
+
+# What the assistant reads from a message, in the order the fields are reported:
+# (profile field, anchors, reader). The reader only runs when one of the anchors (literals that every
+# match contains) is in the message. Another biomarker is one more row here.
+MESSAGE_FIELDS = [
+    ('AMH(ng/mL)', ('amh',), value_reader(r'amh\s*(?:is|:)?\s*(\d+(\.\d+)?)', float, lambda v: 0 < v < 50)),
+    ('Cycle(R/I)', ('regular',), lambda text, found: 4 if 'irregular' in found else 2),
+    ('Age', ('years old', 'yrs', 'age'), value_reader(r'(\d+)\s*(?:years old|yrs|age)', int, lambda v: 10 < v < 60)),
+    ('Weight gain(Y/N)', ('weight',), lambda text, found: 1 if 'gain' in found or 'high' in found else None),
+]
 
-    if 'weight' in text and ('gain' in text or 'high' in text):
-        data['Weight gain(Y/N)'] = 1
+DIAGNOSE_WORDS = ('diagnose', 'predict', 'do i have', 'results', 'analysis')
+CLINIC_LOCATIONS = ('maadi', 'downtown', 'nasr city')
+MESSAGE_KEYWORDS = ('irregular', 'gain', 'high', 'lab', 'test', 'book', 'clinic', 'doctor') + DIAGNOSE_WORDS + CLINIC_LOCATIONS
+
+def trie_regex(words):
+    # one alternation for many literals, factored into a trie ("a(?:mh|nalysis)|..."); the longest word
+    # that starts at a position wins
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+    return emit(trie)
+
+class MessageScanner:
+    # Finds every keyword of a message in one pass of a single compiled pattern; the profile fields and
+    # the intent of respond() are then read from that set. The pattern is a lookahead, so it reports the
+    # longest keyword starting at every position, overlapping ones included ("labook"); the shorter
+    # keywords it starts with are added from `prefixes`. Its cost follows the length of the message, not
+    # the number of keywords (benchmarks/bench_assistant_extractor.py).
+
+    def __init__(self, fields, keywords):
+        self.fields = [(field, frozenset(anchors), read) for field, anchors, read in fields]
+        self.keywords = tuple(dict.fromkeys([a for _, anchors, _ in fields for a in anchors] + list(keywords)))
+        self.prefixes = {k: frozenset(p for p in self.keywords if k.startswith(p)) for k in self.keywords}
+        first = ''.join(sorted({re.escape(k[0]) for k in self.keywords}))
+        self.findall = re.compile(f"(?=[{first}])(?=({trie_regex(self.keywords)}))").findall
+
+    def scan(self, text):
+        # `text` is already lower-case; returns (profile fields, keywords found)
+        found = set().union(*map(self.prefixes.__getitem__, self.findall(text)))
+        data = {}
+        for field, anchors, read in self.fields:
+            if not anchors.isdisjoint(found):
+                value = read(text, found)
+                if value is not None:
+                    data[field] = value
+        return data, found
+
+message_scanner = MessageScanner(MESSAGE_FIELDS, MESSAGE_KEYWORDS)
+
+# The directory the assistant searches: the built-in lists above, or PCOS_CLINICS / PCOS_LABS (a CSV
+# file, or an SQLite database with a "clinics" / "labs" table). Clinics are found by name and location,
+# labs by name, location and test. Words that only say what the user wants ("find a clinic") are not
+# looked up.
+SEARCH_LIMIT = int(os.environ.get('PCOS_SEARCH_LIMIT', 5))
+QUERY_STOP_WORDS = frozenset(search_tokens(' '.join(DIAGNOSE_WORDS + ('lab', 'test', 'book', 'clinic', 'doctor'))) + [
+    'a', 'an', 'the', 'in', 'at', 'near', 'for', 'find', 'show', 'me', 'my', 'i', 'is', 'are', 'there', 'any',
+    'please', 'want', 'need', 'where', 'can', 'you', 'to', 'of', 'clinics', 'doctors', 'labs', 'tests'])
+clinic_directory = DirectoryIndex(load_directory(os.environ.get('PCOS_CLINICS'), 'clinics', clinic_database), ('name', 'location'))
+lab_directory = DirectoryIndex(load_directory(os.environ.get('PCOS_LABS'), 'labs', lab_database), ('name', 'location', 'tests'))
 
-    return data
+def extract_medical_data_smart(text):
+    return message_scanner.scan(text.lower())[0]
 
 def tool_predict_pcos_enhanced(memory):
     try:
-        pipeline = joblib.load('pcos_pipeline.pkl')
-        feature_names = joblib.load('model_features.pkl')
+        model = pcos_model.get()
 
         inputs = json.loads(memory.get_profile_json())
-        input_df = pd.DataFrame([inputs])
-
-        for col in feature_names:
-            if col not in input_df.columns:
-                input_df[col] = 0
-        input_df = input_df[feature_names]
+        input_df = model.frame(inputs)
 
-        prob = pipeline.predict_proba(input_df)[0][1]
+        prob = model.pipeline.predict_proba(input_df)[0][1]
         prediction = 1 if prob > 0.5 else 0
 
         result_text = "High Risk (Positive)" if prediction == 1 else "Low Risk (Negative)"
@@ -113,62 +479,67 @@ def tool_predict_pcos_enhanced(memory):
         return {"error": str(e)}
 
 def tool_search_clinics(query):
-    query = query.lower()
-    results = [c for c in clinic_database if query in c['location'].lower() or query in c['name'].lower()]
+    results = clinic_directory.search(query, SEARCH_LIMIT, QUERY_STOP_WORDS)
     if not results: return "No clinics found in that area. Try 'Downtown' or 'Maadi'."
     return "\n".join([f"🏥 {r['name']} ({r['location']}) - {r['specialty']}" for r in results])
 
 def tool_search_labs(query):
-    query = query.lower()
-    results = [l for l in lab_database if query in l['location'].lower() or any(query in t.lower() for t in l['tests'])]
-    if not results: return "No specific labs found. Showing all: " + ", ".join([l['name'] for l in lab_database])
+    results = lab_directory.search(query, SEARCH_LIMIT, QUERY_STOP_WORDS)
+    if not results:
+        shown = "all" if len(lab_directory) <= SEARCH_LIMIT else f"the top {SEARCH_LIMIT}"
+        return f"No specific labs found. Showing {shown}: " + ", ".join([l['name'] for l in lab_directory.top(SEARCH_LIMIT)])
     return "\n".join([f"🧪 {r['name']} ({r['location']}) - Tests: {', '.join(r['tests'])}" for r in results])
 
 def tool_book(service_type, details):
     ref = f"{service_type[0]}BK-{random.randint(1000,9999)}"
     return f"✅ SUCCESS: Booked {service_type} ({details}). Reference: {ref}"
 
-class PCOS_System:
-    def __init__(self):
-        self.memory = SessionMemory()
-        print("🤖 PCOS Assistant Initialized. (Type 'exit' to stop)")
+def respond(memory, user_input):
+    # one assistant turn for a session; returns the reply and the profile fields taken from the message
+    user_input_lower = user_input.lower()
 
-    def handle_input(self, user_input):
-        user_input_lower = user_input.lower()
+    extracted_data, found = message_scanner.scan(user_input_lower)
+    if extracted_data:
+        memory.update(extracted_data)
 
-        extracted_data = extract_medical_data_smart(user_input)
-        if extracted_data:
-            self.memory.update(extracted_data)
-            updates = ", ".join([f"{k}: {v}" for k,v in extracted_data.items()])
-            print(f"   [System Note: Updated profile with {updates}]")
+    if not found.isdisjoint(DIAGNOSE_WORDS):
+        if not memory.is_data_sufficient():
+            return "I need a bit more info to give a prediction. Please tell me your AMH level or if your cycle is regular.", extracted_data
 
-        if any(w in user_input_lower for w in ['diagnose', 'predict', 'do i have', 'results', 'analysis']):
-            if not self.memory.is_data_sufficient():
-                return "I need a bit more info to give a prediction. Please tell me your AMH level or if your cycle is regular."
+        res = tool_predict_pcos_enhanced(memory)
+        if "error" in res: return f"Error: {res['error']}", extracted_data
 
-            res = tool_predict_pcos_enhanced(self.memory)
-            if "error" in res: return f"Error: {res['error']}"
+        return (f"\n📊 **Analysis Result:** {res['result']}\n"
+                f"🎯 **Confidence:** {res['confidence']}\n"
+                f"💡 **Medical Note:** {res['advice']}"), extracted_data
 
-            return (f"\n📊 **Analysis Result:** {res['result']}\n"
-                    f"🎯 **Confidence:** {res['confidence']}\n"
-                    f"💡 **Medical Note:** {res['advice']}")
+    elif 'lab' in found or 'test' in found:
+        if 'book' in found:
+            return tool_book("Lab", "Standard Panel"), extracted_data
+        search_term = "amh" if "amh" in found else "general"
+        return tool_search_labs(search_term), extracted_data
 
-        elif 'lab' in user_input_lower or 'test' in user_input_lower:
-            if 'book' in user_input_lower:
-                return tool_book("Lab", "Standard Panel")
-            search_term = "amh" if "amh" in user_input_lower else "general"
-            return tool_search_labs(search_term)
+    elif 'clinic' in found or 'doctor' in found:
+        if 'book' in found:
+            return tool_book("Doctor", "Next Available Slot"), extracted_data
 
-        elif 'clinic' in user_input_lower or 'doctor' in user_input_lower:
-            if 'book' in user_input_lower:
-                return tool_book("Doctor", "Next Available Slot")
+        found_loc = next((loc for loc in CLINIC_LOCATIONS if loc in found), "")
+        return tool_search_clinics(found_loc if found_loc else user_input_lower), extracted_data
 
-            locs = ['maadi', 'downtown', 'nasr city']
-            found_loc = next((loc for loc in locs if loc in user_input_lower), "")
-            return tool_search_clinics(found_loc if found_loc else user_input_lower)
+    else:
+        return "I can help with PCOS Analysis, Finding Clinics, or Booking Labs. Please share your symptoms (e.g., 'My AMH is 7') or ask for a clinic.", extracted_data
 
-        else:
-            return "I can help with PCOS Analysis, Finding Clinics, or Booking Labs. Please share your symptoms (e.g., 'My AMH is 7') or ask for a clinic."
+class PCOS_System:
+    def __init__(self):
+        self.memory = SessionMemory()
+        print("🤖 PCOS Assistant Initialized. (Type 'exit' to stop)")
+
+    def handle_input(self, user_input):
+        reply, extracted_data = respond(self.memory, user_input)
+        if extracted_data:
+            updates = ", ".join([f"{k}: {v}" for k,v in extracted_data.items()])
+            print(f"   [System Note: Updated profile with {updates}]")
+        return reply
 
 if __name__ == "__main__":
     system = PCOS_System()
@@ -0,0 +1,33 @@
+# gunicorn settings for the Python backend:
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master and the workers are forked from it, so models listed in
+# WARMUP_MODELS and the dashboard tables are shared copy-on-write instead of loaded per worker.
+# Before forking, everything allocated so far is moved out of the garbage collector's reach
+# (gc.freeze), otherwise a collection in a worker would write to those objects and copy their pages.
+# The Keras image models should be left out of WARMUP_MODELS here: TensorFlow is not fork-safe once
+# initialized, so they load lazily in each worker (the TFLite/ONNX backends can be preloaded).
+import gc
+import os
+import sys
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+def when_ready(server):
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+
+def post_worker_init(worker):
+    from inference.registry import memory_usage
+    # the inference pool (INFERENCE_WORKERS) is per gunicorn worker, so it is started after the fork
+    inferencePool = getattr(sys.modules.get("app"), "inferencePool", None)
+    if inferencePool is not None:
+        inferencePool.start()
+    usage = memory_usage()
+    worker.log.info("worker %s started: RSS %.1f MB, PSS %.1f MB", worker.pid,
+                    (usage["rss_bytes"] or 0) / 2**20, usage.get("pss_bytes", 0) / 2**20)
@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+
+class Overloaded(Exception):
+    # the model's queue is full; answered with 429
+    status = 429
+
+class QueueTimeout(Exception):
+    # a queued request waited longer than the limiter's timeout; answered with 503
+    status = 503
+
+def parse_limits(value, default):
+    # "brainTumor=2, skinCancer=1, *=8" -> ({'brainTumor': 2, 'skinCancer': 1}, 8)
+    limits = {}
+    for item in (value or "").split(","):
+        name, _, limit = item.partition("=")
+        if not name.strip() or not limit.strip():
+            continue
+        if name.strip() == "*":
+            default = int(limit)
+        else:
+            limits[name.strip()] = int(limit)
+    return limits, default
+
+class ModelLimiter:
+    # At most `concurrency` requests of one model run at a time and at most `queue_size` wait for a
+    # slot; anything beyond that is rejected at once instead of piling up behind a slow model.
+
+    def __init__(self, name, concurrency, queue_size, timeout=None):
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+        self.queue_size = max(0, int(queue_size))
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def check(self):
+        # raises Overloaded if a new request would have neither a free slot nor room in the queue. The
+        # counters, not the semaphore, decide: with a timeout, wait_for() acquires it in another task, so
+        # a burst in one loop iteration would all see it unlocked.
+        if self.active + self.waiting >= self.concurrency + self.queue_size:
+            self.rejected += 1
+            raise Overloaded(self.name)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        # counted as waiting before the first await, so the next request of the burst sees it
+        self.check()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise QueueTimeout(self.name)
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "timeout": self.timeout,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,97 @@
+import os
+import threading
+
+import numpy as np
+
+# The image models are served through one of these backends, picked by the
+# file extension of the model: .h5 (full Keras), .tflite or .onnx. All of them
+# take a float32 NHWC batch and return the model's output rows.
+
+def preprocess_efficientnet(x):
+    # same as tensorflow.keras.applications.efficientnet.preprocess_input, which is
+    # a pass-through because EfficientNet rescales its input inside the model;
+    # kept here so the lightweight backends never have to import tensorflow
+    return x
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(path)
+
+    def predict(self, x):
+        return self.model.predict(x, verbose=0)
+
+def load_tflite_interpreter(path, num_threads=None):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+    return Interpreter(model_path=path, num_threads=num_threads)
+
+class TFLiteBackend:
+    name = "tflite"
+
+    def __init__(self, path, num_threads=None):
+        self.interpreter = load_tflite_interpreter(path, num_threads)
+        self.interpreter.allocate_tensors()
+        self._lock = threading.Lock()
+        self._refresh_details()
+
+    def _refresh_details(self):
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+
+    def _resize(self, batch_size):
+        shape = list(self.input["shape"])
+        if shape[0] == batch_size:
+            return
+        shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self.input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self._refresh_details()
+
+    def predict(self, x):
+        # an interpreter is not thread safe; the micro-batcher already serializes calls
+        with self._lock:
+            self._resize(len(x))
+            dtype = self.input["dtype"]
+            if dtype in (np.int8, np.uint8):
+                scale, zero_point = self.input["quantization"]
+                x = np.clip(np.round(x / scale + zero_point), np.iinfo(dtype).min, np.iinfo(dtype).max)
+            self.interpreter.set_tensor(self.input["index"], np.ascontiguousarray(x, dtype=dtype))
+            self.interpreter.invoke()
+            out = self.interpreter.get_tensor(self.output["index"])
+            if self.output["dtype"] in (np.int8, np.uint8):
+                scale, zero_point = self.output["quantization"]
+                out = (out.astype(np.float32) - zero_point) * scale
+            return np.array(out, dtype=np.float32)
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, x):
+        return self.session.run(None, {self.input_name: np.asarray(x, dtype=np.float32)})[0]
+
+backends = {".h5": KerasBackend, ".keras": KerasBackend, ".tflite": TFLiteBackend, ".onnx": OnnxBackend}
+backend_extensions = {"keras": ".h5", "tflite": ".tflite", "onnx": ".onnx"}
+
+def image_model_path(models_dir, name, backend):
+    if backend not in backend_extensions:
+        raise ValueError(f"unknown image backend '{backend}', expected one of {list(backend_extensions)}")
+    return os.path.join(models_dir, name + backend_extensions[backend])
+
+def load_image_model(path):
+    return backends[os.path.splitext(path)[1].lower()](path)
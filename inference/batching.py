@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+class MicroBatcher:
+    # Collects single-request tensors from many threads and runs them through
+    # the model as one batch, so concurrent requests share a single forward pass.
+
+    def __init__(self, predict, max_batch_size=8, max_wait_ms=5, name="model"):
+        self.predict_fn = predict
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._items = 0
+        self._failures = 0
+        self._busy_seconds = 0.0
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, x):
+        # x keeps its leading batch dimension, e.g. (1, 224, 224, 3) for one image
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((np.asarray(x), future))
+        return future
+
+    def predict(self, x, timeout=None):
+        return self.submit(x).result(timeout)
+
+    def _collect(self):
+        item = self._queue.get()
+        batch = [item]
+        size = len(item[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(x, f) for x, f in self._collect() if f.set_running_or_notify_cancel()]
+            if batch:
+                self._execute(batch)
+
+    def _execute(self, batch):
+        inputs = batch[0][0] if len(batch) == 1 else np.concatenate([x for x, _ in batch])
+        started = time.perf_counter()
+        try:
+            outputs = self.predict_fn(inputs)
+        except Exception as e:
+            with self._stats_lock:
+                self._failures += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        elapsed = time.perf_counter() - started
+
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(inputs)
+            self._batch_sizes[len(inputs)] += 1
+            self._busy_seconds += elapsed
+
+        offset = 0
+        for x, future in batch:
+            future.set_result(outputs[offset:offset + len(x)])
+            offset += len(x)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "failures": self._failures,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "avg_batch_ms": self._busy_seconds * 1000.0 / self._batches if self._batches else 0.0,
+                "batch_sizes": {str(k): v for k, v in sorted(self._batch_sizes.items())},
+            }
@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+class LRUCache:
+    # Thread-safe LRU with an optional TTL and an optional total size cap.
+    # `sizeof` gives the size of a value when max_bytes is set; maxsize=None only caps the size.
+
+    def __init__(self, maxsize=1024, ttl=None, max_bytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: getattr(value, "nbytes", 0))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires, _ = entry
+            if expires is not None and expires < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize == 0:
+            return
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires, size)
+            self._bytes += size
+            while (self.maxsize is not None and len(self._data) > self.maxsize) or (self.max_bytes and self._bytes > self.max_bytes):
+                self._evict_oldest()
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict_oldest(self):
+        key, (value, _, size) = self._data.popitem(last=False)
+        self._bytes -= size
+        self.evictions += 1
+        self.on_evict(key, value)
+
+    def on_evict(self, key, value):
+        pass
+
+    def invalidate(self, predicate=None):
+        # drops every entry (or the ones whose key matches predicate) and returns how many were dropped
+        with self._lock:
+            keys = list(self._data) if predicate is None else [k for k in self._data if predicate(k)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        return self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes if self.max_bytes else None,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class DiskBackedLRUCache(LRUCache):
+    # LRUCache of NumPy arrays that also keeps every value as a .npy file in `directory`, so results
+    # survive restarts: a memory miss falls back to the file. Keys are tuples of filename-safe strings.
+    # The directory is trimmed back to max_disk_bytes by dropping the least recently used files.
+
+    def __init__(self, directory=None, max_disk_bytes=None, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(f.stat().st_size for f in os.scandir(directory) if f.name.endswith(".npy"))
+
+    def _path(self, key):
+        return os.path.join(self.directory, "-".join(str(part) for part in key) + ".npy")
+
+    def get(self, key, default=None):
+        value = super().get(key)
+        if value is not None or not self.directory or self.maxsize == 0:
+            return default if value is None else value
+        path = self._path(key)
+        try:
+            value = np.load(path, allow_pickle=False)
+            os.utime(path)
+        except (OSError, ValueError):
+            return default
+        with self._lock:
+            self.disk_hits += 1
+        super().set(key, value)
+        return value
+
+    def set(self, key, value):
+        super().set(key, value)
+        if not self.directory or self.maxsize == 0:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.save(f, value, allow_pickle=False)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Could not write cache file {path}: {e}")
+            return
+        with self._disk_lock:
+            self.disk_writes += 1
+            self._disk_bytes += size
+            if self.max_disk_bytes and self._disk_bytes > self.max_disk_bytes:
+                self._trim_disk()
+
+    def _trim_disk(self):
+        # drops the oldest files until the directory is back under 90% of the cap
+        files = [f for f in os.scandir(self.directory) if f.name.endswith(".npy")]
+        files.sort(key=lambda f: f.stat().st_mtime_ns)
+        total = sum(f.stat().st_size for f in files)
+        for f in files:
+            if total <= self.max_disk_bytes * 0.9:
+                break
+            try:
+                size = f.stat().st_size
+                os.remove(f.path)
+            except OSError:
+                continue
+            total -= size
+            self.disk_evictions += 1
+        self._disk_bytes = total
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            "directory": self.directory,
+            "disk_bytes": self._disk_bytes if self.directory else None,
+            "max_disk_bytes": self.max_disk_bytes if self.directory else None,
+            "disk_hits": self.disk_hits,
+            "disk_writes": self.disk_writes,
+            "disk_evictions": self.disk_evictions,
+        })
+        return stats
@@ -0,0 +1,339 @@
+import json
+import os
+
+import numpy as np
+
+from common.files import file_sha256
+
+# Tree ensembles flattened into plain NumPy arrays so a prediction is a few
+# vectorized gathers per tree level instead of a trip through sklearn/XGBoost/
+# LightGBM input validation. Models are compiled offline by
+# tools/compile_tabular_models.py; the scaler (or ColumnTransformer) in front of
+# the trees is folded in as an element-wise affine transform and one-hot columns.
+
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+ZERO_THRESHOLD = 1e-35
+
+class CompiledEnsemble:
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.kind = meta["kind"]
+        self.numeric_columns = meta["numeric_columns"]
+        self.categorical_columns = meta["categorical_columns"]
+        self.categories = meta["categories"]
+        self.classes = np.asarray(meta["classes"])
+        self.base_margin = meta["base_margin"]
+        self.max_depth = meta["max_depth"]
+        self.input_dtype = np.dtype(meta["input_dtype"])
+        self.compare_lt = meta["compare"] == "lt"
+        self.sub, self.div, self.mul, self.add = (arrays[k] for k in ("sub", "div", "mul", "add"))
+        self.roots = arrays["roots"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.missing_left = arrays["missing_left"]
+        self.missing_kind = arrays["missing_kind"]
+        self.value = arrays["value"]
+        # The walk works on p = 2 * node: the per-node arrays are repeated twice so
+        # p and p + 1 both see node p // 2, and step[p + went_left] is 2 * next node.
+        # One tree level is then a handful of flat gathers and no np.where.
+        self._feature = np.repeat(self.feature, 2)
+        self._threshold = np.repeat(self.threshold, 2)
+        self._missing_left = np.repeat(self.missing_left, 2)
+        self._missing_kind = np.repeat(self.missing_kind, 2)
+        self._step = 2 * np.column_stack([self.right, self.left]).ravel()
+        self._is_leaf = np.repeat(self.left == np.arange(len(self.left)), 2)
+        self.has_zero_missing = bool(np.any(self.missing_kind == MISSING_ZERO))
+        self.has_none_missing = bool(np.any(self.missing_kind == MISSING_NONE))
+
+    @property
+    def n_features(self):
+        return len(self.sub)
+
+    def save(self, path):
+        arrays = {k: getattr(self, k) for k in ("sub", "div", "mul", "add", "roots", "feature", "threshold", "left", "right", "missing_left", "missing_kind", "value")}
+        np.savez(path, meta=np.array(json.dumps(self.meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files if k != "meta"}
+            meta = json.loads(str(data["meta"]))
+        return cls(arrays, meta)
+
+    def is_current(self, sources):
+        # the artifact is only trusted for the exact pickles it was compiled and verified against
+        if not self.meta.get("verified"):
+            return False
+        expected = self.meta.get("sources", {})
+        return all(expected.get(os.path.basename(p)) == file_sha256(p) for p in sources)
+
+    def encode_frame(self, df):
+        # builds the pre-scaling model input (numeric columns, then one-hot columns) from a DataFrame
+        X = np.empty((len(df), self.n_features), dtype=np.float64)
+        for j, col in enumerate(self.numeric_columns):
+            X[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        j = len(self.numeric_columns)
+        for col, cats in zip(self.categorical_columns, self.categories):
+            values = df[col].to_numpy(dtype=object)
+            for cat in cats:
+                X[:, j] = values == cat
+                j += 1
+        return X
+
+    def transform(self, X):
+        # same operation order as StandardScaler ((x - mean) / scale) and MinMaxScaler (x * scale + min),
+        # so the folded transform is bit-for-bit identical to the sklearn one
+        X = (X - self.sub) / self.div * self.mul + self.add
+        return X.astype(self.input_dtype, copy=False)
+
+    def leaves(self, X):
+        n, n_features = X.shape
+        p = np.broadcast_to(2 * self.roots, (n, len(self.roots)))
+        X = X.ravel()
+        offsets = 0 if n == 1 else (np.arange(n) * n_features)[:, None]
+        has_nan = bool(np.isnan(X).any())
+        # leaves point to themselves, so rows that reach a leaf early just stay there
+        for level in range(self.max_depth):
+            v = X[offsets + self._feature[p]]
+            threshold = self._threshold[p]
+            if has_nan and self.has_none_missing:
+                v = np.where(np.isnan(v) & (self._missing_kind[p] == MISSING_NONE), 0, v)
+            go_left = v < threshold if self.compare_lt else v <= threshold
+            if has_nan or self.has_zero_missing:
+                kind = self._missing_kind[p]
+                missing = np.isnan(v) & (kind != MISSING_NONE)
+                if self.has_zero_missing:
+                    missing |= (kind == MISSING_ZERO) & (np.abs(v) <= ZERO_THRESHOLD)
+                go_left = np.where(missing, self._missing_left[p], go_left)
+            p = self._step[p + go_left]
+            # deep, unbalanced trees (LightGBM) usually finish long before max_depth
+            if level % 4 == 3 and self._is_leaf[p].all():
+                break
+        return p // 2
+
+    def predict_proba(self, X):
+        # X is the unscaled model input, as returned by encode_frame; returns an (n, 2) array
+        leaf_values = self.value[self.leaves(self.transform(np.asarray(X, dtype=np.float64)))]
+        if self.kind == "forest":
+            return leaf_values.mean(axis=1)
+        margin = leaf_values[..., 0].sum(axis=1) + self.base_margin
+        p = 1.0 / (1.0 + np.exp(-margin))
+        return np.column_stack([1.0 - p, p])
+
+    def predict_labels(self, proba):
+        if self.kind == "forest":
+            return self.classes[np.argmax(proba, axis=1)]
+        return self.classes[(proba[:, 1] > 0.5).astype(int)]
+
+    def predict(self, X):
+        return self.predict_labels(self.predict_proba(X))
+
+def load_compiled_model(path, sources):
+    # returns None (use the original estimator) when the artifact is missing, unverified or stale
+    if not os.path.exists(path):
+        return None
+    try:
+        compiled = CompiledEnsemble.load(path)
+    except Exception as e:
+        print(f"Could not load compiled model {path}: {e}")
+        return None
+    if not compiled.is_current(sources):
+        print(f"Compiled model {path} does not match {[os.path.basename(p) for p in sources]}, using the original estimator")
+        return None
+    return compiled
+
+# ---- compilation (needs the training libraries, only used offline) ----
+
+class _TreeBuilder:
+    def __init__(self, n_outputs):
+        self.n_outputs = n_outputs
+        self.roots, self.feature, self.threshold = [], [], []
+        self.left, self.right, self.missing_left, self.missing_kind = [], [], [], []
+        self.value = []
+        self.max_depth = 0
+
+    def add_tree(self, nodes, depth):
+        # nodes: list of (feature or -1, threshold, left, right, missing_left, missing_kind, value) with tree-local ids
+        offset = len(self.feature)
+        self.roots.append(offset)
+        self.max_depth = max(self.max_depth, depth)
+        for i, (feature, threshold, left, right, missing_left, missing_kind, value) in enumerate(nodes):
+            leaf = feature < 0
+            self.feature.append(0 if leaf else feature)
+            self.threshold.append(np.nan if leaf else threshold)
+            self.left.append(offset + (i if leaf else left))
+            self.right.append(offset + (i if leaf else right))
+            self.missing_left.append(bool(missing_left))
+            self.missing_kind.append(missing_kind)
+            self.value.append(np.zeros(self.n_outputs) if value is None else value)
+
+    def arrays(self, threshold_dtype):
+        return {
+            "roots": np.asarray(self.roots, dtype=np.int64),
+            "feature": np.asarray(self.feature, dtype=np.int64),
+            "threshold": np.asarray(self.threshold, dtype=threshold_dtype),
+            "left": np.asarray(self.left, dtype=np.int64),
+            "right": np.asarray(self.right, dtype=np.int64),
+            "missing_left": np.asarray(self.missing_left, dtype=bool),
+            "missing_kind": np.asarray(self.missing_kind, dtype=np.int8),
+            "value": np.asarray(self.value, dtype=np.float64).reshape(len(self.value), self.n_outputs),
+        }
+
+def _depth(children, node=0):
+    left, right = children
+    if left[node] < 0:
+        return 0
+    return 1 + max(_depth(children, left[node]), _depth(children, right[node]))
+
+def _compile_forest(model):
+    builder = _TreeBuilder(len(model.classes_))
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=bool))
+        values = tree.value[:, 0, :]
+        values = values / values.sum(axis=1, keepdims=True)
+        nodes = [(int(tree.feature[i]) if tree.children_left[i] >= 0 else -1, float(tree.threshold[i]),
+                  int(tree.children_left[i]), int(tree.children_right[i]), missing_left[i], MISSING_NAN, values[i])
+                 for i in range(tree.node_count)]
+        builder.add_tree(nodes, _depth((tree.children_left, tree.children_right)))
+    meta = {"kind": "forest", "compare": "le", "input_dtype": "float32", "base_margin": 0.0, "classes": model.classes_.tolist()}
+    return builder, meta, np.float64
+
+def _compile_xgboost(model):
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw(raw_format="json"))
+    learner = dump["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"unsupported XGBoost objective {objective}")
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    builder = _TreeBuilder(1)
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        left, right = tree["left_children"], tree["right_children"]
+        nodes = [(tree["split_indices"][i] if left[i] >= 0 else -1, tree["split_conditions"][i], left[i], right[i],
+                  tree["default_left"][i], MISSING_NAN, [tree["split_conditions"][i]] if left[i] < 0 else None)
+                 for i in range(len(left))]
+        builder.add_tree(nodes, _depth((left, right)))
+    meta = {"kind": "boosting", "compare": "lt", "input_dtype": "float32",
+            "base_margin": float(np.log(base_score / (1.0 - base_score))), "classes": model.classes_.tolist()}
+    return builder, meta, np.float32
+
+def _compile_lightgbm(model):
+    dump = model.booster_.dump_model()
+    if not dump["objective"].startswith("binary") or dump.get("average_output"):
+        raise ValueError(f"unsupported LightGBM objective {dump['objective']}")
+    missing_kinds = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+    builder = _TreeBuilder(1)
+    for info in dump["tree_info"]:
+        nodes = []
+
+        def visit(node):
+            i = len(nodes)
+            nodes.append(None)
+            if "leaf_value" in node:
+                nodes[i] = (-1, 0.0, -1, -1, False, MISSING_NONE, [node["leaf_value"]])
+                return i, 0
+            if node["decision_type"] != "<=":
+                raise ValueError("categorical LightGBM splits are not supported")
+            left, left_depth = visit(node["left_child"])
+            right, right_depth = visit(node["right_child"])
+            nodes[i] = (node["split_feature"], node["threshold"], left, right, node["default_left"],
+                        missing_kinds[node["missing_type"]], None)
+            return i, 1 + max(left_depth, right_depth)
+
+        _, depth = visit(info["tree_structure"])
+        builder.add_tree(nodes, depth)
+    meta = {"kind": "boosting", "compare": "le", "input_dtype": "float64", "base_margin": 0.0, "classes": model.classes_.tolist()}
+    return builder, meta, np.float64
+
+def _compile_estimator(model):
+    name = type(model).__name__
+    if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        return _compile_forest(model)
+    if name == "XGBClassifier":
+        return _compile_xgboost(model)
+    if name == "LGBMClassifier":
+        return _compile_lightgbm(model)
+    raise ValueError(f"cannot compile {name}")
+
+def _scaler_arrays(scaler, n):
+    identity = {"sub": np.zeros(n), "div": np.ones(n), "mul": np.ones(n), "add": np.zeros(n)}
+    name = type(scaler).__name__ if scaler is not None else None
+    if name is None:
+        return identity
+    if name == "StandardScaler":
+        if scaler.with_mean:
+            identity["sub"] = np.asarray(scaler.mean_, dtype=np.float64)
+        if scaler.with_std:
+            identity["div"] = np.asarray(scaler.scale_, dtype=np.float64)
+        return identity
+    if name == "MinMaxScaler":
+        if scaler.clip:
+            raise ValueError("MinMaxScaler(clip=True) is not supported")
+        identity["mul"] = np.asarray(scaler.scale_, dtype=np.float64)
+        identity["add"] = np.asarray(scaler.min_, dtype=np.float64)
+        return identity
+    raise ValueError(f"cannot fold {name}")
+
+def compile_model(estimator, scaler=None, columns=None):
+    # estimator may be a bare ensemble, a Pipeline(scaler, ensemble) or a
+    # Pipeline(ColumnTransformer(StandardScaler, OneHotEncoder), ensemble)
+    numeric_columns, categorical_columns, categories = list(columns or []), [], []
+    transform = {}
+    if type(estimator).__name__ == "Pipeline":
+        steps = [step for _, step in estimator.steps]
+        if len(steps) != 2:
+            raise ValueError("only two-step pipelines can be compiled")
+        prefix, estimator = steps
+        if type(prefix).__name__ == "ColumnTransformer":
+            numeric_columns, transform, categorical_columns, categories = _column_transformer_parts(prefix)
+        else:
+            scaler = prefix
+            numeric_columns = list(getattr(prefix, "feature_names_in_", numeric_columns))
+    elif scaler is not None and hasattr(scaler, "feature_names_in_"):
+        numeric_columns = list(scaler.feature_names_in_)
+
+    builder, meta, threshold_dtype = _compile_estimator(estimator)
+    n_features = len(numeric_columns) + sum(len(c) for c in categories)
+    if not transform:
+        transform = _scaler_arrays(scaler, n_features)
+    meta.update({
+        "numeric_columns": numeric_columns,
+        "categorical_columns": categorical_columns,
+        "categories": categories,
+        "max_depth": builder.max_depth,
+    })
+    arrays = builder.arrays(threshold_dtype)
+    arrays.update(transform)
+    return CompiledEnsemble(arrays, meta)
+
+def _column_transformer_parts(column_transformer):
+    numeric_columns, categorical_columns, categories = [], [], []
+    scaler_parts = []
+    for name, step, cols in column_transformer.transformers_:
+        if name == "remainder":
+            if step != "drop":
+                raise ValueError("ColumnTransformer remainder must be dropped")
+            continue
+        kind = type(step).__name__
+        if kind == "StandardScaler":
+            if categorical_columns:
+                raise ValueError("numeric columns must come before one-hot columns")
+            numeric_columns += list(cols)
+            scaler_parts.append(_scaler_arrays(step, len(cols)))
+        elif kind == "OneHotEncoder":
+            drop = step.drop_idx_ if step.drop_idx_ is not None else [None] * len(cols)
+            for col, cats, dropped in zip(cols, step.categories_, drop):
+                kept = [c for i, c in enumerate(cats) if dropped is None or i != dropped]
+                if any(not isinstance(c, str) for c in kept):
+                    raise ValueError("only string categories are supported")
+                categorical_columns.append(col)
+                categories.append(kept)
+        else:
+            raise ValueError(f"cannot fold {kind} from a ColumnTransformer")
+    n_onehot = sum(len(c) for c in categories)
+    transform = {k: np.concatenate([p[k] for p in scaler_parts] + [np.full(n_onehot, 0.0 if k in ("sub", "add") else 1.0)])
+                 for k in ("sub", "div", "mul", "add")}
+    return numeric_columns, transform, categorical_columns, categories
@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+
+from inference.tabular import (
+    convert_to_valid_binary, convert_to_valid_gender,
+    HEART_COLUMNS, KIDNEY_FIELDS, KIDNEY_NUMERIC, PCOS_DEFAULTS, PCOS_BLOOD_GROUPS,
+    sex_map, cp_map, restecg_map, exang_map, slope_map,
+)
+
+# Request encoders for the compiled tabular models: each one knows the column
+# positions of its model up front and writes request values straight into a
+# float64 row that starts from a precomputed default vector, so no DataFrame is
+# built per request. The records are expected to have passed validate_records.
+
+class FeatureEncoder:
+    def __init__(self, columns, defaults=None):
+        self.columns = list(columns)
+        self.index = {c: i for i, c in enumerate(self.columns)}
+        self.defaults = np.zeros(len(self.columns), dtype=np.float64)
+        for col, value in (defaults or {}).items():
+            if col in self.index:
+                self.defaults[self.index[col]] = float(value)
+        self._local = threading.local()
+
+    def encode(self, records):
+        # a single record is written into a per-thread buffer that is reused by the
+        # next call on the same thread, so use (or copy) the result before encoding again
+        if len(records) == 1:
+            out = getattr(self._local, "row", None)
+            if out is None:
+                out = self._local.row = np.empty((1, len(self.columns)), dtype=np.float64)
+            out[0] = self.defaults
+        else:
+            out = np.tile(self.defaults, (len(records), 1))
+        for row, data in zip(out, records):
+            self.write(data, row)
+        return out
+
+    def write(self, data, row):
+        raise NotImplementedError
+
+class HeartEncoder(FeatureEncoder):
+    def __init__(self, columns=HEART_COLUMNS):
+        super().__init__(columns)
+        (self.age, self.sex, self.cp, self.bp, self.chol, self.fbs, self.ecg, self.maxhr,
+         self.angina, self.oldpeak, self.slope, self.maxhr_age, self.oldpeak_slope) = (self.index[c] for c in HEART_COLUMNS)
+
+    def write(self, data, row):
+        slope = slope_map.get(data['ST_Slope'], 1)
+        row[self.age] = float(data['Age'])
+        row[self.sex] = sex_map.get(convert_to_valid_gender(data['Sex'], 'Male', 'Female'), 1)
+        row[self.cp] = cp_map.get(data['ChestPainType'], 0)
+        row[self.bp] = float(data['RestingBP'])
+        row[self.chol] = float(data['Cholesterol'])
+        row[self.fbs] = float(data['FastingBS'])
+        row[self.ecg] = restecg_map.get(data['RestingECG'], 1)
+        row[self.maxhr] = float(data['MaxHR'])
+        row[self.angina] = exang_map.get(convert_to_valid_binary(data['ExerciseAngina'], 1, 0), 0)
+        row[self.oldpeak] = float(data['Oldpeak'])
+        row[self.slope] = slope
+        row[self.maxhr_age] = row[self.maxhr] / row[self.age]
+        row[self.oldpeak_slope] = row[self.oldpeak] * slope
+
+class KidneyEncoder(FeatureEncoder):
+    def __init__(self, columns=KIDNEY_FIELDS):
+        super().__init__(columns)
+        self.numeric = [(d, self.index[d]) for d in KIDNEY_NUMERIC]
+        self.htn = self.index['Htn']
+
+    def write(self, data, row):
+        for d, i in self.numeric:
+            row[i] = float(data[d])
+        row[self.htn] = convert_to_valid_binary(data['Htn'], 1, 0)
+
+class DiabetesEncoder(FeatureEncoder):
+    # writes the model input after the pipeline's column transformer but before
+    # scaling: the numeric columns, then one column per kept one-hot category
+    def __init__(self, numeric_columns, categorical_columns, categories):
+        columns = list(numeric_columns) + [f"{col}_{cat}" for col, cats in zip(categorical_columns, categories) for cat in cats]
+        super().__init__(columns)
+        self.numeric = [(c, self.index[c]) for c in numeric_columns]
+        self.onehot = []
+        for col, cats in zip(categorical_columns, categories):
+            self.onehot.append((col, {cat: self.index[f"{col}_{cat}"] for cat in cats}))
+
+    def write(self, data, row):
+        for col, i in self.numeric:
+            value = data[col]
+            if col in ('hypertension', 'heart_disease'):
+                value = convert_to_valid_binary(value, 1, 0)
+            row[i] = np.nan if value is None else float(value)
+        for col, positions in self.onehot:
+            value = data[col]
+            if col == 'gender':
+                value = convert_to_valid_gender(value, 'Male', 'Female')
+            # unknown categories (and the dropped first one) stay all zeros, like handle_unknown='ignore'
+            i = positions.get(value) if isinstance(value, str) else None
+            if i is not None:
+                row[i] = 1.0
+
+class PcosEncoder(FeatureEncoder):
+    def __init__(self, columns=tuple(PCOS_DEFAULTS)):
+        super().__init__(columns, PCOS_DEFAULTS)
+        self.age = self.index['Age (yrs)']
+        self.bmi = self.index['BMI']
+        self.pulse = self.index['Pulse rate(bpm)']
+        self.blood_groups = {g: self.index[f'Blood Group_{g}'] for g in PCOS_BLOOD_GROUPS}
+        # the defaults mark B+, but every request sets its own blood group
+        for i in self.blood_groups.values():
+            self.defaults[i] = 0.0
+
+    def write(self, data, row):
+        row[self.age] = float(data['age'])
+        row[self.bmi] = float(data['bmi'])
+        row[self.pulse] = float(data['pulse_rate'])
+        i = self.blood_groups.get(data['blood_group']) if isinstance(data['blood_group'], str) else None
+        if i is not None:
+            row[i] = 1.0
+
+def build_encoder(name, compiled):
+    # lays the encoder out exactly like the compiled model's input columns
+    if name == "heartFailure":
+        return HeartEncoder(compiled.numeric_columns)
+    if name == "kidney":
+        return KidneyEncoder(compiled.numeric_columns)
+    if name == "diabetes":
+        return DiabetesEncoder(compiled.numeric_columns, compiled.categorical_columns, compiled.categories)
+    if name == "pcos":
+        return PcosEncoder(compiled.numeric_columns)
+    raise ValueError(f"no feature encoder for {name}")
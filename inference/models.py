@@ -0,0 +1,101 @@
+import os
+
+import joblib
+
+from inference.tabular import (
+    HEART_FIELDS, HEART_NUMERIC, HEART_KEY, heart_frame,
+    KIDNEY_FIELDS, KIDNEY_NUMERIC, KIDNEY_KEY, kidney_frame,
+    DIABETES_FIELDS, DIABETES_NUMERIC, DIABETES_KEY, diabetes_frame,
+    PCOS_FIELDS, PCOS_NUMERIC, PCOS_KEY, pcos_frame,
+)
+from inference.registry import ModelRegistry
+from inference.backends import image_model_path, load_image_model
+from inference.compiled import load_compiled_model
+from inference.encoders import build_encoder
+
+# The models the app serves and the functions that run them on a batch of validated records. Kept apart
+# from app.py so the inference workers (inference/workers.py) can load them without Flask or the dashboards.
+
+modelsDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+# models are loaded on first use; SERVED_MODELS limits which ones this process may load
+# (e.g. "diabetes,pcos") and WARMUP_MODELS loads some or "all" of them at startup
+registry = ModelRegistry(served=os.environ.get("SERVED_MODELS"))
+# IMAGE_BACKEND=tflite/onnx serves the CNNs from files made by `python -m tools.export_image_models`
+imageBackend = os.environ.get("IMAGE_BACKEND", "keras")
+registry.register("brainTumor", image_model_path(modelsDir, "brainTumor", imageBackend), load_image_model)
+registry.register("skinCancer", image_model_path(modelsDir, "skinCancer", imageBackend), load_image_model)
+registry.register("pcos", os.path.join(modelsDir, "pcos.pkl"), joblib.load)
+registry.register("diabetes", os.path.join(modelsDir, "diabetes.pkl"), joblib.load)
+registry.register("heartFailureScaler", os.path.join(modelsDir, "scaler_heart.pkl"), joblib.load, group="heartFailure")
+registry.register("heartFailure", os.path.join(modelsDir, "heart_clinic_model_optimized.pkl"), joblib.load)
+registry.register("kidney", os.path.join(modelsDir, "kidney_model.pkl"), joblib.load)
+registry.register("kidneyScaler", os.path.join(modelsDir, "kidney_scaler.pkl"), joblib.load, group="kidney")
+
+# NumPy-compiled copies of the tree models made by `python -m tools.compile_tabular_models`; each one is
+# only used if it was verified against the exact pickles above, otherwise the original estimator is used
+tabularFastPath = os.environ.get("TABULAR_FAST_PATH", "1") != "0"
+
+def load_fast_path(name, path, sources):
+    compiled = load_compiled_model(path, sources) if tabularFastPath else None
+    return None if compiled is None else (compiled, build_encoder(name, compiled))
+
+def register_compiled(name, *sources):
+    sources = [os.path.join(modelsDir, s) for s in sources]
+    loader = lambda path: load_fast_path(name, path, sources)
+    registry.register(name + "Compiled", os.path.join(modelsDir, "compiled", name + ".npz"), loader, group=name)
+
+register_compiled("heartFailure", "heart_clinic_model_optimized.pkl", "scaler_heart.pkl")
+register_compiled("kidney", "kidney_model.pkl", "kidney_scaler.pkl")
+register_compiled("diabetes", "diabetes.pkl")
+register_compiled("pcos", "pcos.pkl")
+
+def compiled_predict(name, records):
+    # the compiled model and its encoder never build a DataFrame; None means use the original estimator
+    fast_path = registry.get(name + "Compiled")
+    if fast_path is None:
+        return None
+    compiled, encoder = fast_path
+    try:
+        proba = compiled.predict_proba(encoder.encode(records))
+    except Exception as e:
+        print(f"Compiled {name} model failed, falling back to the original estimator: {e}")
+        return None
+    return compiled.predict_labels(proba), proba[:, 1]
+
+def predict_heart_batch(records):
+    fast = compiled_predict("heartFailure", records)
+    if fast is not None:
+        predictions, probabilities = fast
+    else:
+        heartFailureModel = registry.get("heartFailure")
+        input_data_scaled = registry.get("heartFailureScaler").transform(heart_frame(records))
+        predictions = heartFailureModel.predict(input_data_scaled)
+        probabilities = heartFailureModel.predict_proba(input_data_scaled)[:, 1]
+    return [{"prediction": int(p), "probability": float(q)} for p, q in zip(predictions, probabilities)]
+
+def predict_kidney_batch(records):
+    fast = compiled_predict("kidney", records)
+    if fast is not None:
+        predictions = fast[0]
+    else:
+        data_scaled = registry.get("kidneyScaler").transform(kidney_frame(records))
+        predictions = registry.get("kidney").predict(data_scaled)
+    return [{"prediction": int(p)} for p in predictions]
+
+def predict_diabetes_batch(records):
+    fast = compiled_predict("diabetes", records)
+    predictions = fast[0] if fast is not None else registry.get("diabetes").predict(diabetes_frame(records))
+    return [{"prediction": int(p), "label": 'positive' if p else 'negative'} for p in predictions]
+
+def predict_pcos_batch(records):
+    fast = compiled_predict("pcos", records)
+    predictions = fast[0] if fast is not None else registry.get("pcos").predict(pcos_frame(records))
+    return [{"prediction": int(p), "label": 'positive' if p else 'negative'} for p in predictions]
+
+batch_models = {
+    "heartFailure": (HEART_FIELDS, HEART_NUMERIC, (), HEART_KEY, predict_heart_batch),
+    "kidney": (KIDNEY_FIELDS, KIDNEY_NUMERIC, ['Htn'], KIDNEY_KEY, predict_kidney_batch),
+    "diabetes": (DIABETES_FIELDS, DIABETES_NUMERIC, (), DIABETES_KEY, predict_diabetes_batch),
+    "pcos": (PCOS_FIELDS, PCOS_NUMERIC, (), PCOS_KEY, predict_pcos_batch),
+}
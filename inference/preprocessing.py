@@ -0,0 +1,51 @@
+import numpy as np
+from PIL import Image
+
+from inference.backends import preprocess_efficientnet
+
+# JPEGs are decoded by libjpeg at 1/2, 1/4 or 1/8 scale when that still leaves at least
+# DRAFT_OVERSAMPLE times the target size, so the resize afterwards still antialiases
+DRAFT_OVERSAMPLE = 2
+
+def scale_unit(x):
+    # in-place x / 255.0; gives exactly the float32 values of the original float64 division
+    np.divide(x, 255.0, out=x)
+    return x
+
+# input size (width, height) and in-place preprocessing of each CNN
+IMAGE_SPECS = {
+    "brainTumor": {"size": (224, 224), "preprocess": preprocess_efficientnet},
+    "skinCancer": {"size": (150, 150), "preprocess": scale_unit},
+}
+
+def decode_image(stream, size, out, draft=True):
+    # decodes one image, resized to `size`, into the float32 (height, width, 3) array `out`
+    img = Image.open(stream)
+    if draft and img.format == "JPEG":
+        img.draft("RGB", (size[0] * DRAFT_OVERSAMPLE, size[1] * DRAFT_OVERSAMPLE))
+    img = img.convert('RGB')
+    if img.size != size:
+        img = img.resize(size)
+    out[...] = np.asarray(img)
+    return out
+
+def preprocess_images(name, streams, executor=None, draft=True):
+    # decodes the images into one preallocated float32 batch and applies the model's preprocessing
+    # in place; with an executor the images are decoded in parallel (PIL releases the GIL)
+    spec = IMAGE_SPECS[name]
+    width, height = spec["size"]
+    batch = np.empty((len(streams), height, width, 3), dtype=np.float32)
+    decode = lambda i: decode_image(streams[i], spec["size"], batch[i], draft)
+    if executor is None:
+        for i in range(len(streams)):
+            decode(i)
+    else:
+        list(executor.map(decode, range(len(streams))))
+    return spec["preprocess"](batch)
+
+def preprocess_image(name, stream, executor=None, draft=True):
+    # single image as a (1, height, width, 3) batch; with an executor the decode runs in its pool,
+    # which caps how many full-size images are decoded at the same time
+    if executor is None:
+        return preprocess_images(name, [stream], draft=draft)
+    return executor.submit(preprocess_images, name, [stream], None, draft).result()
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+
+class ModelNotServed(LookupError):
+    pass
+
+def parse_model_list(value):
+    # "diabetes, pcos" -> {'diabetes', 'pcos'}; None or "all" means every registered model
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    names = {v.strip() for v in value if v and v.strip()}
+    return None if 'all' in names else names
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def current_rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def memory_usage():
+    # RSS of this process split into pages shared with other processes (e.g. forked workers,
+    # memory-mapped files) and private ones; PSS charges each shared page to its sharers equally
+    usage = {"pid": os.getpid(), "rss_bytes": current_rss_bytes()}
+    fields = {"Pss": "pss_bytes", "Shared_Clean": "shared_clean_bytes", "Shared_Dirty": "shared_dirty_bytes",
+              "Private_Clean": "private_clean_bytes", "Private_Dirty": "private_dirty_bytes"}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in fields:
+                    usage[fields[key]] = int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return usage
+
+class ModelRegistry:
+    # Loads each model the first time it is requested instead of at import time.
+    # Models that share an endpoint (e.g. a scaler and its classifier) are put in
+    # the same group, and `served` lists the groups this process is allowed to load.
+
+    def __init__(self, served=None):
+        # an empty list is treated like an unset one: serve everything
+        self.served = parse_model_list(served) or None
+        self._specs = {}
+        self._models = {}
+        self._locks = {}
+        self._info = {}
+        self._groups = set()
+        self._signatures = {}
+        self._versions = {}
+        self._listeners = []
+        self._last_refresh = time.monotonic()
+        self._refresh_lock = threading.Lock()
+
+    def register(self, name, path, loader, group=None):
+        self._specs[name] = {"path": path, "loader": loader, "group": group or name}
+        self._locks[name] = threading.Lock()
+        self._groups.add(group or name)
+        self._signatures[name] = file_signature(path)
+
+    def groups(self):
+        return sorted(self._groups)
+
+    def is_served(self, name):
+        spec = self._specs.get(name)
+        group = spec["group"] if spec else name
+        if group not in self._groups:
+            return False
+        return self.served is None or group in self.served
+
+    def check(self, name):
+        if not self.is_served(name):
+            raise ModelNotServed(name)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        # a loader may return None (e.g. an optional artifact that is missing); that is cached too
+        try:
+            return self._models[name]
+        except KeyError:
+            pass
+        self.check(name)
+        with self._locks[name]:
+            if name not in self._models:
+                self._load(name)
+            return self._models[name]
+
+    def _load(self, name):
+        spec = self._specs[name]
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        model = spec["loader"](spec["path"])
+        elapsed = time.perf_counter() - started
+        rss_after = current_rss_bytes()
+        self._info[name] = {
+            "load_seconds": round(elapsed, 4),
+            # only an estimate: other threads may allocate while the model loads
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        }
+        self._models[name] = model
+        if model is not None:
+            print(f"Loaded model {name} in {elapsed:.2f}s")
+
+    def warm_up(self, names=None):
+        # names uses the same format as `served`; groups that are not served are skipped
+        wanted = parse_model_list(names)
+        if wanted is not None and not wanted:
+            return
+        for name, spec in self._specs.items():
+            if (wanted is None or spec["group"] in wanted or name in wanted) and self.is_served(name):
+                self.get(name)
+
+    def unload(self, name):
+        with self._locks[name]:
+            self._models.pop(name, None)
+            self._info.pop(name, None)
+
+    def version(self, group):
+        # bumped every time a file of the group changes on disk, so it can scope cached results
+        return self._versions.get(group, 0)
+
+    def signature(self, name):
+        # (mtime_ns, size) of the file the model was (or will be) loaded from
+        return self._signatures.get(name)
+
+    def on_change(self, callback):
+        # callback(group) runs after the files of a group changed and its models were unloaded
+        self._listeners.append(callback)
+
+    def refresh(self):
+        # unloads every model of a group whose files changed; they are reloaded on next use
+        changed = set()
+        for name, spec in self._specs.items():
+            signature = file_signature(spec["path"])
+            if signature != self._signatures[name]:
+                self._signatures[name] = signature
+                changed.add(spec["group"])
+        for group in sorted(changed):
+            for name, spec in self._specs.items():
+                if spec["group"] == group:
+                    self.unload(name)
+            self._versions[group] = self._versions.get(group, 0) + 1
+            print(f"Model files of {group} changed, reloading on next use")
+            for callback in self._listeners:
+                callback(group)
+        return sorted(changed)
+
+    def refresh_if_due(self, interval):
+        # cheap enough to call on every request: only stats the files every `interval` seconds
+        if interval is None or interval < 0 or time.monotonic() - self._last_refresh < interval:
+            return []
+        if not self._refresh_lock.acquire(blocking=False):
+            return []
+        try:
+            self._last_refresh = time.monotonic()
+            return self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def status(self):
+        status = {}
+        for name, spec in self._specs.items():
+            try:
+                file_bytes = os.path.getsize(spec["path"])
+            except OSError:
+                file_bytes = None
+            status[name] = {
+                "group": spec["group"],
+                "version": self.version(spec["group"]),
+                "path": os.path.basename(spec["path"]),
+                "served": self.is_served(name),
+                "loaded": self._models.get(name) is not None,
+                "file_bytes": file_bytes,
+                **self._info.get(name, {}),
+            }
+        return {"rss_bytes": current_rss_bytes(), "models": status}
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+
+def convert_to_valid_binary(x, true, false):
+    if type(x) == str: x = x.lower().strip()
+    if x in ['yes', 'y', True, 'true', 1]: return true
+    if x in ['no', 'n', False, 'false', 0]: return false
+    return None
+
+def convert_to_valid_gender(x, male, female):
+    if type(x) == str: x = x.lower().strip()
+    if x in ['male', 'm']: return male
+    if x in ['female', 'f']: return female
+    return None
+
+def is_number(x):
+    if x is None or isinstance(x, (list, dict)): return False
+    try:
+        float(x)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+def validate_records(records, fields, numeric=(), binary=()):
+    # returns the indices of usable records and {index: message} for the rest
+    valid, errors = [], {}
+    for i, data in enumerate(records):
+        if not isinstance(data, dict):
+            errors[i] = "each record must be a JSON object"
+            continue
+        missing = next((d for d in fields if d not in data), None)
+        if missing is not None:
+            errors[i] = f"{missing} is missing, please provide it"
+            continue
+        bad = next((d for d in fields if isinstance(data[d], (list, dict))), None)
+        if bad is not None:
+            errors[i] = f"{bad} must be a single value"
+            continue
+        bad = next((d for d in numeric if not is_number(data[d])), None)
+        if bad is not None:
+            errors[i] = f"{bad} must be a number"
+            continue
+        bad = next((d for d in binary if convert_to_valid_binary(data[d], 1, 0) is None), None)
+        if bad is not None:
+            errors[i] = f"{bad} must be yes or no"
+            continue
+        valid.append(i)
+    return valid, errors
+
+def canonical_record(data, fields, normalizers):
+    # the feature values a model actually sees, used as a cache key: "yes"/"Y"/1 or
+    # "140"/140.0 end up equal; fields without a normalizer are numeric
+    return tuple(normalizers.get(d, float)(data[d]) for d in fields)
+
+def numeric_column(records, field):
+    return np.array([float(r[field]) for r in records], dtype=np.float64)
+
+HEART_FIELDS = ['Age', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol', 'FastingBS', 'RestingECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'ST_Slope']
+HEART_NUMERIC = ['Age', 'RestingBP', 'Cholesterol', 'FastingBS', 'MaxHR', 'Oldpeak']
+HEART_COLUMNS = HEART_FIELDS + ['MaxHR_Age', 'Oldpeak_Slope']
+
+sex_map = {'Male': 1, 'Female': 0}
+cp_map = {'ASY': 0, 'ATA': 1, 'NAP': 2, 'TA': 3}
+restecg_map = {'Normal': 1, 'ST-T Wave Abnormality': 2, 'LVH': 0}
+exang_map = {'Yes': 1, 'No': 0}
+slope_map = {'Up': 2, 'Flat': 1, 'Down': 0}
+
+HEART_KEY = {
+    'Sex': lambda x: sex_map.get(convert_to_valid_gender(x, 'Male', 'Female'), 1),
+    'ChestPainType': lambda x: cp_map.get(x, 0),
+    'RestingECG': lambda x: restecg_map.get(x, 1),
+    'ExerciseAngina': lambda x: exang_map.get(convert_to_valid_binary(x, 1, 0), 0),
+    'ST_Slope': lambda x: slope_map.get(x, 1),
+}
+
+def heart_frame(records):
+    df = pd.DataFrame({
+        'Age': numeric_column(records, 'Age'),
+        'Sex': [sex_map.get(convert_to_valid_gender(r['Sex'], 'Male', 'Female'), 1) for r in records],
+        'ChestPainType': [cp_map.get(r['ChestPainType'], 0) for r in records],
+        'RestingBP': numeric_column(records, 'RestingBP'),
+        'Cholesterol': numeric_column(records, 'Cholesterol'),
+        'FastingBS': numeric_column(records, 'FastingBS'),
+        'RestingECG': [restecg_map.get(r['RestingECG'], 1) for r in records],
+        'MaxHR': numeric_column(records, 'MaxHR'),
+        'ExerciseAngina': [exang_map.get(convert_to_valid_binary(r['ExerciseAngina'], 1, 0), 0) for r in records],
+        'Oldpeak': numeric_column(records, 'Oldpeak'),
+        'ST_Slope': [slope_map.get(r['ST_Slope'], 1) for r in records],
+    })
+    df['MaxHR_Age'] = df['MaxHR'] / df['Age']
+    # slope codes are 0 (Down), 1 (Flat) and 2 (Up), which is also the Oldpeak multiplier
+    df['Oldpeak_Slope'] = df['Oldpeak'] * df['ST_Slope']
+    return df[HEART_COLUMNS]
+
+KIDNEY_FIELDS = ['Bp', 'Sg', 'Al', 'Su', 'Rbc', 'Bu', 'Sc', 'Sod', 'Pot', 'Hemo', 'Wbcc', 'Rbcc', 'Htn']
+KIDNEY_NUMERIC = KIDNEY_FIELDS[:-1]
+
+KIDNEY_KEY = {'Htn': lambda x: convert_to_valid_binary(x, 1, 0)}
+
+def kidney_frame(records):
+    columns = {d: numeric_column(records, d) for d in KIDNEY_NUMERIC}
+    columns['Htn'] = np.array([convert_to_valid_binary(r['Htn'], 1, 0) for r in records], dtype=np.float64)
+    return pd.DataFrame(columns)
+
+DIABETES_FIELDS = ['gender', 'age', 'hypertension', 'heart_disease', 'smoking_history', 'bmi', 'HbA1c_level', 'blood_glucose_level']
+DIABETES_NUMERIC = ['age', 'bmi', 'HbA1c_level', 'blood_glucose_level']
+
+DIABETES_KEY = {
+    'gender': lambda x: convert_to_valid_gender(x, 'Male', 'Female'),
+    'hypertension': lambda x: convert_to_valid_binary(x, 1, 0),
+    'heart_disease': lambda x: convert_to_valid_binary(x, 1, 0),
+    'smoking_history': lambda x: x,
+}
+
+def diabetes_frame(records):
+    return pd.DataFrame({
+        "gender": [convert_to_valid_gender(r['gender'], 'Male', 'Female') for r in records],
+        "age": numeric_column(records, 'age'),
+        "hypertension": [convert_to_valid_binary(r['hypertension'], 1, 0) for r in records],
+        "heart_disease": [convert_to_valid_binary(r['heart_disease'], 1, 0) for r in records],
+        "smoking_history": [r['smoking_history'] for r in records],
+        "bmi": numeric_column(records, 'bmi'),
+        "HbA1c_level": numeric_column(records, 'HbA1c_level'),
+        "blood_glucose_level": numeric_column(records, 'blood_glucose_level')
+    })
+
+PCOS_FIELDS = ['bmi', 'age', 'pulse_rate', 'blood_group']
+PCOS_NUMERIC = ['bmi', 'age', 'pulse_rate']
+
+# values used for every feature the chat assistant does not ask about
+PCOS_DEFAULTS = {
+    "Age (yrs)": 33,
+    "Weight (Kg)": 58,
+    "Height(Cm)": 159,
+    "BMI": 23.14,
+    "Pulse rate(bpm)": 72,
+    "RR (breaths/min)": 20,
+    "Hb(g/dl)": 11,
+    "Cycle(R/I)": 2,
+    "Cycle length(days)": 5,
+    "Marraige Status (Yrs)": 13,
+    "No. of aborptions": 2,
+    "I   beta-HCG(mIU/mL)": 100,
+    "II    beta-HCG(mIU/mL)": 100,
+    "FSH(mIU/mL)": 4.9,
+    "LH(mIU/mL)": 3.1,
+    "FSH/LH": 1.6,
+    "Hip(inch)": 44,
+    "Waist(inch)": 38,
+    "Waist:Hip Ratio": .9,
+    "TSH (mIU/L)": 12.2,
+    "AMH(ng/mL)": 1.5,
+    "PRL(ng/mL)": 4,
+    "Vit D3 (ng/mL)": 38,
+    "PRG(ng/mL)": .26,
+    "RBS(mg/dl)": 91,
+    "BP _Systolic (mmHg)": 120,
+    "BP _Diastolic (mmHg)": 80,
+    "Follicle No. (L)": 7,
+    "Follicle No. (R)": 6,
+    "Avg. F size (L) (mm)": 15,
+    "Avg. F size (R) (mm)": 18,
+    "Endometrium (mm)": 7,
+    "Blood Group_A-": False,
+    "Blood Group_AB+": False,
+    "Blood Group_AB-": False,
+    "Blood Group_B+": True,
+    "Blood Group_B-": False,
+    "Blood Group_O+": False,
+    "Blood Group_O-": False,
+    "Pregnant(Y/N)_yes": True,
+    "Weight gain(Y/N)_yes": True,
+    "hair growth(Y/N)_yes": False,
+    "Skin darkening (Y/N)_yes": False,
+    "Hair loss(Y/N)_yes": False,
+    "Pimples(Y/N)_yes": False,
+    "Fast food (Y/N)_yes": False,
+    "Reg.Exercise(Y/N)_yes": False
+}
+PCOS_BLOOD_GROUPS = ['A-', 'AB+', 'AB-', 'B+', 'B-', 'O+', 'O-']
+
+PCOS_KEY = {'blood_group': lambda x: x if x in PCOS_BLOOD_GROUPS else None}
+
+def pcos_frame(records):
+    n = len(records)
+    df = pd.DataFrame({k: np.repeat(v, n) for k, v in PCOS_DEFAULTS.items()})
+    df['Age (yrs)'] = numeric_column(records, 'age')
+    df['BMI'] = numeric_column(records, 'bmi')
+    df['Pulse rate(bpm)'] = numeric_column(records, 'pulse_rate')
+    blood_group = np.array([r['blood_group'] for r in records], dtype=object)
+    for group in PCOS_BLOOD_GROUPS:
+        df[f'Blood Group_{group}'] = blood_group == group
+    return df
@@ -0,0 +1,131 @@
+import binascii
+import hashlib
+import io
+import json
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+# octet-stream bodies larger than this are spooled to a temporary file instead of memory
+SPOOL_MAX_MEMORY = 4 * 2**20
+
+class ImageMissing(ValueError):
+    pass
+
+class ImageDecodeError(ValueError):
+    pass
+
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def hash_stream(stream):
+    # hashes a seekable stream chunk by chunk and rewinds it
+    hasher = hashlib.blake2b(digest_size=16)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+    stream.seek(0)
+    return hasher.hexdigest()
+
+def spool_stream(source):
+    # copies a non-seekable request stream into a SpooledTemporaryFile while hashing it
+    hasher = hashlib.blake2b(digest_size=16)
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled, hasher.hexdigest()
+
+def _skip_space(raw, i):
+    while i < len(raw) and raw[i] in b" \t\r\n":
+        i += 1
+    return i
+
+def _json_image_span(raw):
+    # finds the "image" string value in a raw JSON body without parsing the whole document; returns
+    # (start, end) or None unless "image" is the first key of the top-level object, i.e. {"image": "...", ...}
+    i = _skip_space(raw, 0)
+    if not raw.startswith(b"{", i):
+        return None
+    i = _skip_space(raw, i + 1)
+    if not raw.startswith(b'"image"', i):
+        return None
+    i = _skip_space(raw, i + len(b'"image"'))
+    if not raw.startswith(b":", i):
+        return None
+    i = _skip_space(raw, i + 1)
+    if not raw.startswith(b'"', i):
+        return None
+    end = raw.find(b'"', i + 1)
+    if end < 0 or raw.find(b"\\", i + 1, end) >= 0:
+        return None
+    after = _skip_space(raw, end + 1)
+    if raw.startswith(b",", after):
+        # a repeated key would win in json.loads
+        if raw.find(b'"image"', after) >= 0:
+            return None
+    elif not raw.startswith(b"}", after):
+        return None
+    # the body has to close like an object too (the end is scanned, not copied)
+    tail = len(raw)
+    while tail > after and raw[tail - 1] in b" \t\r\n":
+        tail -= 1
+    if raw[tail - 1] != ord("}"):
+        return None
+    return i + 1, end
+
+def decode_base64_json(raw, parse=None):
+    # decodes the base64 (or data URL) "image" field of a raw JSON body. The base64 text is decoded
+    # straight from a memoryview of the body, so neither the JSON string nor the split copy is made.
+    # Bodies in any other shape go through `parse` (json.loads by default).
+    span = _json_image_span(raw)
+    if span is None:
+        data = parse() if parse else json.loads(raw)
+        value = data.get("image") if isinstance(data, dict) else None
+        if not value:
+            raise ImageMissing("'image' not found in input data.")
+        if not isinstance(value, str):
+            raise ImageDecodeError(f"'image' must be a string, got {type(value).__name__}")
+        raw = value.encode()
+        span = (0, len(raw))
+    start, end = span
+    if start == end:
+        raise ImageMissing("'image' not found in input data.")
+    marker = raw.find(b";base64,", start, end)
+    if marker >= 0:
+        start = marker + len(b";base64,")
+    try:
+        return binascii.a2b_base64(memoryview(raw)[start:end])
+    except binascii.Error as e:
+        raise ImageDecodeError(str(e))
+
+def read_image_upload(request):
+    # returns (stream, digest) for the uploaded image of a Flask request. Accepts multipart/form-data
+    # (field "image"), a raw application/octet-stream or image/* body, or the original JSON body with
+    # a base64 data URL. Raises ImageMissing / ImageDecodeError.
+    mimetype = request.mimetype
+    if mimetype == "multipart/form-data":
+        upload = request.files.get("image")
+        if upload is None:
+            raise ImageMissing("'image' not found in input data.")
+        digest = hash_stream(upload.stream)
+        if not upload.stream.read(1):
+            raise ImageMissing("'image' is empty.")
+        upload.stream.seek(0)
+        return upload.stream, digest
+    if mimetype == "application/octet-stream" or mimetype.startswith("image/"):
+        stream, digest = spool_stream(request.stream)
+        if not stream.read(1):
+            raise ImageMissing("the request body is empty.")
+        stream.seek(0)
+        return stream, digest
+    if not request.is_json:
+        # keeps the original behaviour (415) for anything else
+        request.get_json()
+    image_data = decode_base64_json(request.get_data(), request.get_json)
+    return io.BytesIO(image_data), content_digest(image_data)
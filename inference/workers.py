@@ -0,0 +1,268 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inference.registry import parse_model_list
+
+# Optional pool of inference processes, so CPU-bound model calls (sklearn input validation, tree
+# ensembles, the CNNs) run outside the GIL of the web process. Each worker imports inference/models.py,
+# preloads the models it serves and answers one task at a time over a pipe. Image batches are written
+# to a shared-memory block owned by the worker instead of being pickled. A worker that dies, or does not
+# answer a task or a health check in time, is replaced.
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+class WorkerGone(WorkerCrashed):
+    # the task could not be sent, so the worker never saw it
+    pass
+
+def pool_size(value):
+    # "auto" is one worker per core; unset or 0 disables the pool
+    if not value:
+        return 0
+    if value.strip() == "auto":
+        return os.cpu_count() or 1
+    return max(0, int(value))
+
+def _worker_main(conn, shm_name, preload, watch_seconds):
+    from inference import models
+
+    registry = models.registry
+    wanted = parse_model_list(preload)
+    for group in registry.groups():
+        if wanted is None or group in wanted:
+            try:
+                registry.warm_up(group)
+            except Exception as e:
+                print(f"Inference worker {os.getpid()} could not preload {group}: {e}")
+    # the block belongs to the parent (the workers share its resource tracker, which unlinks it)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        kind = task[0]
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("ok", None))
+            continue
+        try:
+            registry.refresh_if_due(watch_seconds)
+            if kind == "records":
+                _, model, records = task
+                result = models.batch_models[model][4](records)
+            else:
+                _, model, shape, dtype, array = task
+                x = array if array is not None else np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                result = np.array(registry.get(model).predict(x))
+                del x
+            conn.send(("ok", result))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                conn.send(("error", RuntimeError(repr(e))))
+    shm.close()
+
+class _Worker:
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.shm = shared_memory.SharedMemory(create=True, size=pool.tensor_bytes)
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.tasks = 0
+        self.restarts = 0
+
+    def start(self):
+        ctx = self.pool.context
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child, self.shm.name, self.pool.preload, self.pool.watch_seconds),
+            name=f"inference-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def stop(self, timeout=5):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def restart(self):
+        self.stop(timeout=0)
+        self.restarts += 1
+        self.start()
+
+    def _receive(self, timeout):
+        try:
+            answered = self.conn.poll(timeout)
+            if answered:
+                return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerCrashed(f"inference worker {self.index} exited ({self.process.exitcode}): {e}")
+        raise TimeoutError(f"inference worker {self.index} did not answer within {timeout}s")
+
+    def call(self, message, timeout, tensor=None):
+        if not self.ready:
+            self._receive(self.pool.start_timeout)
+            self.ready = True
+        if tensor is not None:
+            np.ndarray(tensor.shape, dtype=tensor.dtype, buffer=self.shm.buf)[...] = tensor
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError) as e:
+            raise WorkerGone(f"inference worker {self.index} is gone: {e}")
+        status, value = self._receive(timeout)
+        self.tasks += 1
+        if status == "error":
+            raise value
+        return value
+
+    def stats(self):
+        return {
+            "pid": self.process.pid if self.process else None,
+            "alive": bool(self.process and self.process.is_alive()),
+            "ready": self.ready,
+            "tasks": self.tasks,
+            "restarts": self.restarts,
+        }
+
+class InferencePool:
+    # Workers are started on first use in each process, so a pool created before gunicorn forks its
+    # workers is started separately in every one of them.
+
+    def __init__(self, size, preload="all", tensor_bytes=16 * 2**20, timeout=60, start_timeout=300,
+                 health_interval=10, watch_seconds=5):
+        self.size = size
+        self.preload = preload
+        self.tensor_bytes = tensor_bytes
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+        self.watch_seconds = watch_seconds
+        # spawned, not forked: the web process has threads (and maybe TensorFlow) that must not be copied
+        self.context = multiprocessing.get_context("spawn")
+        self.failures = 0
+        self._pid = None
+        self._workers = []
+        self._idle = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._workers = [_Worker(self, i) for i in range(self.size)]
+            self._idle = queue.Queue()
+            for worker in self._workers:
+                worker.start()
+                self._idle.put(worker)
+            self._pid = os.getpid()
+            if self.health_interval:
+                threading.Thread(target=self._monitor, name="inference-health", daemon=True).start()
+
+    def _run(self, message, tensor=None):
+        self._ensure_started()
+        worker = self._idle.get()
+        try:
+            if not worker.process.is_alive():
+                # died while idle, before this task reached it
+                self._replace(worker, f"inference worker {worker.index} exited ({worker.process.exitcode})")
+            try:
+                return worker.call(message, self.timeout, tensor)
+            except WorkerGone as e:
+                # not delivered, so it is safe to send once more, to the replacement
+                self._replace(worker, e)
+            return worker.call(message, self.timeout, tensor)
+        except (WorkerCrashed, TimeoutError) as e:
+            self._replace(worker, e)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def _replace(self, worker, reason):
+        self.failures += 1
+        print(f"{reason}, restarting it")
+        worker.restart()
+
+    def predict_records(self, model, records):
+        # what models.batch_models[model] predicts for these records, computed in a worker
+        return self._run(("records", model, records))
+
+    def predict_image(self, model, x):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if x.nbytes > self.tensor_bytes:
+            # larger than the shared block: sent through the pipe instead
+            return self._run(("image", model, x.shape, x.dtype.str, x))
+        return self._run(("image", model, x.shape, x.dtype.str, None), x)
+
+    def check(self):
+        # pings every idle worker and replaces those that are dead or do not answer
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in idle:
+            try:
+                if not worker.process.is_alive():
+                    raise WorkerCrashed(f"inference worker {worker.index} exited ({worker.process.exitcode})")
+                if worker.ready or worker.conn.poll(0):
+                    worker.call(("ping",), timeout=5)
+            except (WorkerCrashed, TimeoutError) as e:
+                print(f"{e}, restarting it")
+                worker.restart()
+            finally:
+                self._idle.put(worker)
+
+    def _monitor(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.health_interval)
+            self.check()
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "started": self._pid == os.getpid(),
+            "failures": self.failures,
+            "workers": [worker.stats() for worker in self._workers] if self._pid == os.getpid() else [],
+        }
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self._pid = None
+        for worker in self._workers:
+            worker.stop()
+            worker.shm.close()
+            worker.shm.unlink()
@@ -0,0 +1,88 @@
+# Computes the feature importances and accuracy shown on the kidney dashboard and writes them to
+# dashboards/kidney_dashboard.json, so the dashboard does not train a model on every start.
+#
+#   python -m tools.build_kidney_dashboard                # same RandomForest the dashboard used to fit
+#   python -m tools.build_kidney_dashboard --from-model   # importances of models/kidney_model.pkl
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common.files import file_sha256
+
+DATA_PATH = os.path.join(ROOT, "dashboards", "kidney.csv")
+MODEL_PATH = os.path.join(ROOT, "models", "kidney_model.pkl")
+ARTIFACT_PATH = os.path.join(ROOT, "dashboards", "kidney_dashboard.json")
+ARTIFACT_VERSION = 1
+
+def load_frame(path=DATA_PATH):
+    # the cleaning the dashboard applies to kidney.csv
+    df = pd.read_csv(path)
+    if df.duplicated().sum() > 0: df.drop_duplicates(inplace=True)
+    for col in df.columns:
+        if df[col].dtype != 'object': df[col] = df[col].fillna(df[col].median())
+    return df
+
+def train_summary(df):
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+
+    X = df.drop('Class', axis=1)
+    y = df['Class']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    rf = RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42)
+    rf.fit(X_train, y_train)
+    acc = accuracy_score(y_test, rf.predict(X_test))
+    return float(acc), list(X.columns), [float(i) for i in rf.feature_importances_]
+
+def model_summary(df, model_path=MODEL_PATH):
+    # importances of the shipped model, accuracy on the whole cleaned dataset
+    import joblib
+    from sklearn.metrics import accuracy_score
+
+    model = joblib.load(model_path)
+    features = list(getattr(model, "feature_names_in_", df.drop('Class', axis=1).columns))
+    scaler_path = os.path.join(os.path.dirname(model_path), "kidney_scaler.pkl")
+    X = df[features]
+    if os.path.exists(scaler_path):
+        X = joblib.load(scaler_path).transform(X)
+    acc = accuracy_score(df['Class'], model.predict(X))
+    return float(acc), features, [float(i) for i in model.feature_importances_]
+
+def build(source="train"):
+    import sklearn
+
+    df = load_frame()
+    acc, features, importances = train_summary(df) if source == "train" else model_summary(df)
+    order = sorted(range(len(features)), key=lambda i: -importances[i])
+    return {
+        "version": ARTIFACT_VERSION,
+        "source": source,
+        "data_sha256": file_sha256(DATA_PATH),
+        "model_sha256": file_sha256(MODEL_PATH) if source == "model" else None,
+        "sklearn_version": sklearn.__version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "accuracy": acc,
+        "features": [{"Feature": features[i], "Importance": importances[i]} for i in order],
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--from-model", action="store_true", help="use models/kidney_model.pkl instead of training")
+    parser.add_argument("--output", default=ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    artifact = build("model" if args.from_model else "train")
+    with open(args.output, "w") as f:
+        json.dump(artifact, f, indent=2)
+    print(f"Wrote {args.output}: accuracy {artifact['accuracy'] * 100:.2f}%, top feature {artifact['features'][0]['Feature']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# Compiles the tabular models in models/ into NumPy tree arrays (models/compiled/*.npz),
+# verifies they give the same predictions as the pickled estimators and reports
+# single-row latency of both paths.
+#
+#   python -m tools.compile_tabular_models
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common.files import file_sha256
+from inference.compiled import compile_model
+from inference.tabular import heart_frame
+
+MODELS_DIR = os.path.join(ROOT, "models")
+COMPILED_DIR = os.path.join(MODELS_DIR, "compiled")
+
+# name: (estimator file, scaler file or None)
+TABULAR_MODELS = {
+    "heartFailure": ("heart_clinic_model_optimized.pkl", "scaler_heart.pkl"),
+    "kidney": ("kidney_model.pkl", "kidney_scaler.pkl"),
+    "diabetes": ("diabetes.pkl", None),
+    "pcos": ("pcos.pkl", None),
+}
+
+def compiled_model_path(name):
+    return os.path.join(COMPILED_DIR, f"{name}.npz")
+
+def model_sources(name):
+    return [os.path.join(MODELS_DIR, f) for f in TABULAR_MODELS[name] if f]
+
+def heart_verification_frame():
+    df = pd.read_csv(os.path.join(ROOT, "dashboards", "heart_dashboard.csv"))
+    return heart_frame(df.drop(columns="HeartDisease").to_dict("records"))
+
+def kidney_verification_frame():
+    df = pd.read_csv(os.path.join(ROOT, "dashboards", "kidney.csv"))
+    return df.drop(columns="Class").dropna().reset_index(drop=True)
+
+def diabetes_verification_frame():
+    df = pd.read_csv(os.path.join(ROOT, "dashboards", "diabetes_prediction_dataset.csv"))
+    return df.drop(columns="diabetes").sample(n=min(len(df), 20000), random_state=0).reset_index(drop=True)
+
+def pcos_verification_frame(columns):
+    df = pd.read_csv(os.path.join(ROOT, "datasets", "pcos", "pcos_model.csv"))
+    df.columns = df.columns.str.strip()
+    df = df.apply(pd.to_numeric, errors="coerce")
+    return df[columns].fillna(df[columns].median()).astype(np.float64).reset_index(drop=True)
+
+def with_synthetic_rows(df, n, seed=0):
+    # real rows plus random rows spread over each column's observed range
+    rng = np.random.default_rng(seed)
+    synthetic = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object or str(values.dtype) in ("str", "string", "category"):
+            synthetic[col] = rng.choice(values.dropna().unique(), size=n)
+        elif values.dtype == bool:
+            synthetic[col] = rng.random(n) < 0.5
+        else:
+            synthetic[col] = rng.uniform(values.min(), values.max(), size=n)
+    return pd.concat([df, pd.DataFrame(synthetic)], ignore_index=True)
+
+def original_predictor(estimator, scaler):
+    if scaler is None:
+        return estimator.predict_proba, estimator.predict
+    return (lambda df: estimator.predict_proba(scaler.transform(df))), (lambda df: estimator.predict(scaler.transform(df)))
+
+def median_us(fn, runs):
+    fn()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings)
+
+def compile_one(name, synthetic_rows, tolerance, runs):
+    estimator_file, scaler_file = TABULAR_MODELS[name]
+    estimator = joblib.load(os.path.join(MODELS_DIR, estimator_file))
+    scaler = joblib.load(os.path.join(MODELS_DIR, scaler_file)) if scaler_file else None
+    compiled = compile_model(estimator, scaler)
+
+    if name == "heartFailure":
+        frame = heart_verification_frame()
+    elif name == "kidney":
+        frame = kidney_verification_frame()
+    elif name == "diabetes":
+        frame = diabetes_verification_frame()
+    else:
+        frame = pcos_verification_frame(compiled.numeric_columns)
+    frame = with_synthetic_rows(frame, synthetic_rows)
+    frame = frame[list(getattr(scaler or estimator, "feature_names_in_", frame.columns))]
+
+    predict_proba, predict = original_predictor(estimator, scaler)
+    expected_proba, expected = predict_proba(frame), predict(frame)
+    proba = compiled.predict_proba(compiled.encode_frame(frame))
+    labels = compiled.predict_labels(proba)
+    max_diff = float(np.max(np.abs(proba - expected_proba)))
+    mismatches = int(np.sum(labels != np.asarray(expected)))
+    verified = max_diff <= tolerance and mismatches == 0
+
+    row = frame.iloc[:1]
+    x = compiled.encode_frame(row)
+    latency = {
+        "original_us": round(median_us(lambda: predict_proba(row), runs), 1),
+        "compiled_us": round(median_us(lambda: compiled.predict_proba(compiled.encode_frame(row)), runs), 1),
+        "compiled_numpy_us": round(median_us(lambda: compiled.predict_proba(x), runs), 1),
+    }
+    print(f"{name}: {len(frame)} rows, max |proba diff| {max_diff:.2e}, label mismatches {mismatches}, "
+          f"{len(compiled.roots)} trees, depth {compiled.max_depth}")
+    print(f"    single row: original {latency['original_us']}us, compiled {latency['compiled_us']}us "
+          f"(from a NumPy row {latency['compiled_numpy_us']}us)")
+
+    path = compiled_model_path(name)
+    if not verified:
+        print(f"    NOT verified, {path} not written (the app keeps using the original estimator)")
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+
+    compiled.meta.update({
+        "verified": True,
+        "verification_rows": len(frame),
+        "max_proba_diff": max_diff,
+        "sources": {os.path.basename(p): file_sha256(p) for p in model_sources(name)},
+    })
+    compiled.save(path)
+    print(f"    wrote {path}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=list(TABULAR_MODELS), choices=list(TABULAR_MODELS))
+    parser.add_argument("--synthetic-rows", type=int, default=5000)
+    parser.add_argument("--tolerance", type=float, default=1e-5, help="max allowed probability difference")
+    parser.add_argument("--runs", type=int, default=300)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    ok = [compile_one(name, args.synthetic_rows, args.tolerance, args.runs) for name in args.models]
+    sys.exit(0 if all(ok) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Writes the dashboard CSVs to uncompressed Arrow/Feather files in dashboards/data/ with categorical
+# and narrow numeric dtypes, so the dashboards can memory-map them instead of parsing the CSVs.
+# Rerun it whenever a CSV changes; stale files are ignored by the dashboards.
+#
+#   python -m tools.convert_datasets
+import argparse
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboards.data import DATASETS, FEATHER_DIR, csv_path, feather_path, optimize_dtypes, read_feather
+from common.files import file_sha256
+
+def convert(name):
+    source = csv_path(name)
+    original = pd.read_csv(source)
+    df = optimize_dtypes(original)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update({b"source": os.path.basename(source).encode(), b"source_sha256": file_sha256(source).encode()})
+    table = table.replace_schema_metadata(metadata)
+    os.makedirs(FEATHER_DIR, exist_ok=True)
+    feather.write_feather(table, feather_path(name), compression="uncompressed")
+
+    # the copy must hold exactly the values of the CSV
+    loaded = read_feather(feather_path(name), file_sha256(source))
+    for col in original.columns:
+        a, b = original[col], loaded[col]
+        if isinstance(b.dtype, pd.CategoricalDtype):
+            b = b.astype(object)
+            a = a.astype(object)
+        if not a.equals(b.astype(a.dtype)):
+            raise ValueError(f"{name}: column {col} changed during conversion")
+    before = original.memory_usage(deep=True).sum()
+    after = loaded.memory_usage(deep=True).sum()
+    print(f"{name}: {len(df)} rows, {before / 2**20:.2f} MB -> {after / 2**20:.2f} MB in memory, "
+          f"{os.path.getsize(feather_path(name)) / 2**20:.2f} MB on disk")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--datasets", nargs="+", default=list(DATASETS), choices=list(DATASETS))
+    args = parser.parse_args()
+    for name in args.datasets:
+        convert(name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Converts the Keras CNNs in models/ to TFLite or ONNX, checks that the exported
+# model agrees with the original .h5 and reports latency and memory per backend.
+#
+#   python -m tools.export_image_models --format tflite --quantize float16 --samples path/to/images
+#   IMAGE_BACKEND=tflite python app.py
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference.backends import image_model_path, load_image_model
+from inference.preprocessing import IMAGE_SPECS, preprocess_images
+from inference.registry import current_rss_bytes
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+# input size and preprocessing of each CNN, shared with the routes in app.py
+IMAGE_MODELS = IMAGE_SPECS
+
+def predicted_labels(name, probabilities):
+    if name == "skinCancer":
+        return (probabilities[:, 0] > 0.42).astype(int)
+    return np.argmax(probabilities, axis=1)
+
+def load_samples(name, samples_dir, count):
+    size = IMAGE_MODELS[name]["size"]
+    preprocess = IMAGE_MODELS[name]["preprocess"]
+    paths = []
+    if samples_dir:
+        for ext in ("jpg", "jpeg", "png", "bmp"):
+            paths += glob.glob(os.path.join(samples_dir, "**", f"*.{ext}"), recursive=True)
+        paths = sorted(paths)[:count]
+    if not paths:
+        print(f"  no sample images found for {name}, using random noise (parity numbers will be less meaningful)")
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, size=(count, size[1], size[0], 3)).astype(np.float32)
+        return preprocess(images)
+    return preprocess_images(name, paths)
+
+def export_tflite(model, out_path, quantize, samples):
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize in ("dynamic", "float16", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    if quantize == "int8":
+        # weights and activations in int8, the model keeps float32 inputs and outputs
+        converter.representative_dataset = lambda: ([samples[i:i + 1]] for i in range(len(samples)))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.TFLITE_BUILTINS]
+    with open(out_path, "wb") as f:
+        f.write(converter.convert())
+
+def export_onnx(model, out_path, quantize, samples):
+    import tensorflow as tf
+    import tf2onnx
+    spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=out_path)
+    if quantize in ("dynamic", "int8"):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(out_path, out_path, weight_type=QuantType.QInt8)
+    elif quantize == "float16":
+        import onnx
+        from onnxconverter_common import float16
+        onnx.save(float16.convert_float_to_float16(onnx.load(out_path), keep_io_types=True), out_path)
+
+def parity(name, reference, exported, samples, batch_size=16):
+    ref = np.concatenate([reference.predict(samples[i:i + batch_size]) for i in range(0, len(samples), batch_size)])
+    out = np.concatenate([exported.predict(samples[i:i + batch_size]) for i in range(0, len(samples), batch_size)])
+    return {
+        "samples": int(len(samples)),
+        "max_abs_diff": float(np.max(np.abs(ref - out))),
+        "mean_abs_diff": float(np.mean(np.abs(ref - out))),
+        "label_agreement": float(np.mean(predicted_labels(name, ref) == predicted_labels(name, out))),
+    }
+
+def _measure(path, shape, runs, queue):
+    rss_start = current_rss_bytes()
+    started = time.perf_counter()
+    backend = load_image_model(path)
+    load_seconds = time.perf_counter() - started
+    x = np.random.default_rng(0).random((1,) + tuple(shape), dtype=np.float32)
+    backend.predict(x)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        backend.predict(x)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    queue.put({
+        "load_seconds": round(load_seconds, 3),
+        "latency_ms_p50": round(statistics.median(timings), 3),
+        "latency_ms_p90": round(float(np.percentile(timings, 90)), 3),
+        "rss_mb": round(current_rss_bytes() / 2 ** 20, 1),
+        "rss_added_mb": round((current_rss_bytes() - rss_start) / 2 ** 20, 1),
+        "file_mb": round(os.path.getsize(path) / 2 ** 20, 2),
+    })
+
+def measure(path, shape, runs):
+    # every backend is measured in a fresh process so RSS numbers don't leak into each other
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(path, shape, runs, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--format", choices=["tflite", "onnx"], default="tflite")
+    parser.add_argument("--quantize", choices=["none", "dynamic", "float16", "int8"], default="none")
+    parser.add_argument("--models", nargs="+", default=list(IMAGE_MODELS), choices=list(IMAGE_MODELS))
+    parser.add_argument("--samples", help="directory of sample images for int8 calibration and the parity check")
+    parser.add_argument("--sample-count", type=int, default=64)
+    parser.add_argument("--runs", type=int, default=50, help="timed single-image predictions per backend")
+    parser.add_argument("--report", default=os.path.join(MODELS_DIR, "export_report.json"))
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+
+    report = {"format": args.format, "quantize": args.quantize, "models": {}}
+    for name in args.models:
+        print(f"--- {name} ---")
+        source = image_model_path(MODELS_DIR, name, "keras")
+        target = image_model_path(MODELS_DIR, name, args.format)
+        model = load_model(source)
+        samples = load_samples(name, args.samples, args.sample_count)
+
+        export = export_tflite if args.format == "tflite" else export_onnx
+        export(model, target, args.quantize, samples)
+        print(f"  wrote {target}")
+
+        reference = load_image_model(source)
+        exported = load_image_model(target)
+        entry = {"parity": parity(name, reference, exported, samples)}
+        print(f"  parity: {entry['parity']}")
+
+        shape = samples.shape[1:]
+        entry["keras"] = measure(source, shape, args.runs)
+        entry[args.format] = measure(target, shape, args.runs)
+        for backend in ("keras", args.format):
+            print(f"  {backend:>6}: {entry[backend]}")
+        report["models"][name] = entry
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+if __name__ == "__main__":
+    main()